@@ -1,41 +1,64 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import os
 
+from app.core.config import settings
+
 # Persistent database for users, wallets, etc.
 PERSISTENT_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/crypto_exchange")
 
+# Async driver URL (asyncpg) derived from the plain postgresql:// URL
+ASYNC_DATABASE_URL = PERSISTENT_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+if settings.DB_USE_PGBOUNCER:
+    # PgBouncer (transaction pooling) rejects custom startup parameters and
+    # closes idle server connections on its own, so recycle below server_idle_timeout.
+    # asyncpg's prepared statement caches must be off as statements don't survive
+    # across pooled server connections.
+    pool_recycle = 60
+    connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+else:
+    pool_recycle = settings.DB_POOL_RECYCLE
+    # Cap query time so a slow statement can't pin a pool slot indefinitely
+    connect_args = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+
+# Every worker opens its own pool, so each gets its share of the connection budget
+pool_size, max_overflow = settings.db_pool_limits()
+
 # Persistent engine for user data
-persistent_engine = create_engine(
-    PERSISTENT_DATABASE_URL,
-    pool_pre_ping=True,
+persistent_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=pool_recycle,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=connect_args,
 )
 
 # Session factory
-PersistentSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=persistent_engine)
+PersistentSessionLocal = async_sessionmaker(
+    bind=persistent_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
 
 
-def get_persistent_db():
+async def get_persistent_db():
     """Get database session for persistent data (users, wallets)."""
-    db = PersistentSessionLocal()
-    try:
+    async with PersistentSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_db():   
+async def get_db():
     """Default database session (persistent)."""
-    db = PersistentSessionLocal()
-    try:
+    async with PersistentSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 # For backward compatibility
 engine = persistent_engine
-SessionLocal = PersistentSessionLocal 
\ No newline at end of file
+SessionLocal = PersistentSessionLocal
@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.security import get_token_user_id
+
+# Parses and validates the "Authorization: Bearer <token>" header
+bearer = HTTPBearer(auto_error=False)
+
+
+async def current_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+) -> int:
+    """Get current user ID from the bearer token's claims."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return get_token_user_id(credentials.credentials)
@@ -0,0 +1,23 @@
+import logging
+import logging.handlers
+import queue
+
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Configure root logging so records are formatted and written off the event loop.
+    
+    Log calls only enqueue the record; a QueueListener thread does the formatting
+    and stream I/O. Returns the started listener, which should be stopped on shutdown.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    
+    listener.start()
+    return listener
@@ -1,6 +1,10 @@
 import os
 from typing import Optional
 
+import redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import SSLConnection
+
 
 class RedisConfig:
     """Redis configuration settings."""
@@ -14,6 +18,21 @@ class RedisConfig:
         self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "10"))
         self.socket_timeout = int(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
         self.socket_connect_timeout = int(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "5"))
+        self.pool_max_size = int(os.getenv("REDIS_POOL_MAXSIZE", str(self.max_connections)))
+        self.blocking_timeout = int(os.getenv("REDIS_BLOCKING_TIMEOUT", str(self.socket_timeout)))
+        # Path of the Redis unix socket, for the order book when colocated
+        # with Redis; TCP is used when unset
+        self.unix_socket_path = os.getenv("REDIS_UNIX_SOCKET") or None
+        # Match orders with the server-side Lua script instead of pipelined
+        # reads and a MULTI of writes from the client
+        self.lua_matching = os.getenv("REDIS_LUA_MATCHING", "false").lower() == "true"
+        # Queue new orders on a per-symbol stream for a matcher process
+        # instead of matching them inside the request
+        self.stream_matching = os.getenv("REDIS_STREAM_MATCHING", "false").lower() == "true"
+        
+        # Shared asyncio connection pool; callers borrow connections instead of
+        # opening a new socket per client
+        self.pool = BlockingConnectionPool(**self.get_pool_kwargs())
     
     @property
     def url(self) -> str:
@@ -39,6 +58,8 @@ class RedisConfig:
             "max_connections": self.max_connections,
             "socket_timeout": self.socket_timeout,
             "socket_connect_timeout": self.socket_connect_timeout,
+            "socket_keepalive": True,
+            "retry_on_timeout": True,
         }
         
         if self.password:
@@ -49,7 +70,52 @@ class RedisConfig:
             kwargs["ssl_cert_reqs"] = None
         
         return kwargs
+    
+    def get_pool_kwargs(self) -> dict:
+        """Get arguments for the shared asyncio connection pool."""
+        kwargs = self.get_connection_kwargs()
+        kwargs["max_connections"] = self.pool_max_size
+        kwargs["timeout"] = self.blocking_timeout
+        
+        # Pools pick SSL through the connection class rather than a flag
+        if kwargs.pop("ssl", False):
+            kwargs["connection_class"] = SSLConnection
+        
+        return kwargs
+    
+    def get_order_book_pool(self, db: Optional[int] = None) -> redis.BlockingConnectionPool:
+        """Get a blocking pool for the synchronous order book client.
+        
+        Replies are left as bytes; the order book decodes only what it
+        returns, rather than every reply on the matching path.
+        """
+        kwargs = self.get_connection_kwargs()
+        kwargs["decode_responses"] = False
+        kwargs["max_connections"] = self.pool_max_size
+        kwargs["timeout"] = self.blocking_timeout
+        if db is not None:
+            kwargs["db"] = db
+        
+        if self.unix_socket_path:
+            # Unix socket connections take a path instead of TCP options
+            for option in ("host", "port", "socket_keepalive", "ssl", "ssl_cert_reqs"):
+                kwargs.pop(option, None)
+            kwargs["connection_class"] = redis.UnixDomainSocketConnection
+            kwargs["path"] = self.unix_socket_path
+        elif kwargs.pop("ssl", False):
+            kwargs["connection_class"] = redis.SSLConnection
+        
+        return redis.BlockingConnectionPool(**kwargs)
+    
+    def get_client(self) -> Redis:
+        """Get an asyncio Redis client backed by the shared connection pool."""
+        return Redis(connection_pool=self.pool)
 
 
 # Global Redis configuration instance
-redis_config = RedisConfig() 
\ No newline at end of file
+redis_config = RedisConfig()
+
+
+async def get_redis_client() -> Redis:
+    """FastAPI dependency providing an asyncio Redis client on the shared pool."""
+    return redis_config.get_client()
@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing, built once at import. New hashes use argon2; existing
+# bcrypt hashes still verify and are upgraded on the next successful login.
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
 # JWT settings (hardcoded for now, should come from config)
 SECRET_KEY = "your-secret-key-change-in-production"
@@ -18,6 +21,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a replacement hash if the stored one is deprecated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
@@ -35,18 +43,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify and decode a JWT token."""
+@lru_cache(maxsize=1024)
+def _decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT signature and return its claims (cached per token string)."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
 
 
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode a JWT token, rejecting it once expired."""
+    payload = _decode_token(token)
+    # Cached claims were verified when first seen, so expiry must be re-checked here
+    if payload is None or payload.get("exp", 0) < time.time():
+        return None
+    return payload
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify and decode a JWT token."""
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return username
+
+
 def get_current_user(token: str):
     """Get current user from JWT token."""
     credentials_exception = HTTPException(
@@ -58,4 +83,18 @@ def get_current_user(token: str):
     username = verify_token(token)
     if username is None:
         raise credentials_exception
-    return username 
\ No newline at end of file
+    return username 
+
+
+def get_token_user_id(token: str) -> int:
+    """Get the user ID carried in a JWT token's claims."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = decode_access_token(token)
+    if payload is None or payload.get("uid") is None:
+        raise credentials_exception
+    return payload["uid"]
@@ -2,54 +2,67 @@ import uvloop
 import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
 import time
 import logging
 
+from app.core.config import settings
 from app.core.db import persistent_engine, Base
+from app.core.logging_config import setup_logging
+from app.core.redis_config import redis_config
 from app.routes import auth, user, order, market, websocket
 
 # Configure uvloop as the event loop policy for better performance
 uvloop.install()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (records are written by a background listener thread)
+log_listener = setup_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables (only persistent tables for users, wallets)
-Base.metadata.create_all(bind=persistent_engine)
-
 # Create FastAPI app
 app = FastAPI(
     title="Crypto Exchange API",
     description="A production-grade crypto exchange backend API with in-memory order book",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Add CORS middleware (browsers cache preflight responses for max_age seconds)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:8080"],
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
+    max_age=600,
 )
 
+# Compress order book / trade history payloads; small responses aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
+# Probe and scrape endpoints are too frequent to be worth a log line each
+UNLOGGED_PATHS = {"/health", "/api/v1/health", "/metrics"}
 
 
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    if not logger.isEnabledFor(logging.INFO) or request.url.path in UNLOGGED_PATHS:
+        return await call_next(request)
+    
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
     response = await call_next(request)
-    process_time = time.time() - start_time
+    process_time = loop.time() - start_time
     
     logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Process Time: {process_time:.4f}s"
+        "%s %s - Status: %s - Process Time: %.4fs",
+        request.method, request.url.path, response.status_code, process_time
     )
     
     return response
@@ -69,12 +82,39 @@ async def startup_event():
     import asyncio
     from app.routes.websocket import start_redis_listener_task
     
-    # Start Redis listener with delay to allow Redis to be ready
-    async def delayed_start():
-        await asyncio.sleep(5)  # Wait 5 seconds for Redis to be ready
-        asyncio.create_task(start_redis_listener_task())
+    # Create database tables (only persistent tables for users, wallets).
+    # Disable with AUTO_CREATE_TABLES=false when the schema is managed by migrations.
+    if settings.AUTO_CREATE_TABLES:
+        async with persistent_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    # Optionally warm a few pooled connections so the first requests don't pay
+    # connection setup
+    prewarm = min(settings.DB_POOL_PREWARM, persistent_engine.pool.size())
+    connections = [await persistent_engine.connect() for _ in range(prewarm)]
+    for connection in connections:
+        await connection.close()
     
-    asyncio.create_task(delayed_start())
+    # Wait until Redis answers before starting the listener
+    redis_client = redis_config.get_client()
+    for _ in range(settings.REDIS_PRESTART_TRIES):
+        try:
+            await redis_client.ping()
+            break
+        except RedisError:
+            await asyncio.sleep(settings.REDIS_PRESTART_WAIT)
+    else:
+        raise RuntimeError(
+            f"Redis not reachable after {settings.REDIS_PRESTART_TRIES} attempts"
+        )
+    
+    asyncio.create_task(start_redis_listener_task())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued log records on application shutdown."""
+    log_listener.stop()
 
 
 @app.get("/")
@@ -94,4 +134,17 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop") 
\ No newline at end of file
+    
+    # Each worker runs its own startup hook, including the Redis listener that
+    # feeds the WebSocket clients connected to that worker, and opens its own
+    # database pool (see Settings.db_pool_limits).
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.WEB_CONCURRENCY,
+        log_config=None,
+        access_log=False,
+    ) 
\ No newline at end of file
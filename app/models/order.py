@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum as PyEnum
@@ -42,7 +42,16 @@ class Order(Base):
     
     # Indexes for efficient order book queries
     __table_args__ = (
-        Index('idx_symbol_side_price', 'symbol', 'side', 'price'),
+        # Covering index so price-level scans are index-only (Postgres 11+ INCLUDE)
+        Index(
+            'idx_book_cover', 'symbol', 'side', 'price',
+            postgresql_include=['quantity', 'filled_quantity', 'status'],
+        ),
+        # Only resting orders are read when matching; enum columns store member names
+        Index(
+            'idx_open_orders', 'symbol', 'side', 'price',
+            postgresql_where=text("status IN ('PENDING', 'PARTIAL')"),
+        ),
         Index('idx_user_status', 'user_id', 'status'),
     )
 
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
 from app.services.auth.auth_service import AuthService
@@ -9,18 +9,18 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     auth_service = AuthService(db)
-    user = auth_service.register_user(user_data)
+    user = await auth_service.register_user(user_data)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user and return JWT token."""
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(user_data)
+    user = await auth_service.authenticate_user(user_data)
     
     if not user:
         raise HTTPException(
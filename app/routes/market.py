@@ -1,9 +1,26 @@
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Depends, Response
+from redis.asyncio import Redis
+
+from app.core.redis_config import get_redis_client
 from app.services.exchange.mock_exchange_service import mock_exchange
 
 router = APIRouter(prefix="/market", tags=["market"])
 
+# Prices are shared by every client, so a short-lived cache absorbs bursts of reads
+PRICES_CACHE_KEY = "market:prices"
+PRICES_CACHE_TTL_MS = 500
+
 @router.get("/prices")
-def get_prices():
+async def get_prices(redis: Redis = Depends(get_redis_client)):
     """Get current prices for all coins from the mock exchange."""
-    return mock_exchange.get_prices() 
\ No newline at end of file
+    payload = await redis.get(PRICES_CACHE_KEY)
+    if payload is None:
+        payload = orjson.dumps(mock_exchange.get_prices())
+        await redis.set(PRICES_CACHE_KEY, payload, px=PRICES_CACHE_TTL_MS)
+    
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=1"}
+    )
@@ -1,50 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
-from typing import Optional, List
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional, List, Union
 
-from app.core.security import get_current_user
+from app.core.deps import current_user_id
 from app.services.order.order_service import OrderService
 from app.schemas.order import (
     OrderCreate, OrderResponse, OrderBookResponse, TradeResponse,
-    OrderCancellationResponse, OrderSummary, OrderStatus
+    TradeColumnsResponse, OrderCancellationResponse, OrderSummary, OrderStatus
 )
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-def get_current_user_id(authorization: Optional[str] = Header(None)) -> int:
-    """Get current user ID from JWT token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    token = authorization.split(" ")[1]
-    username = get_current_user(token)
-    
-    # For now, we'll use a simple approach to get user ID
-    # In a real app, you'd store user ID in the token or query the database
-    from app.core.db import get_persistent_db
-    db = next(get_persistent_db())
-    from app.services.user.user_service import UserService
-    user_service = UserService(db)
-    user = user_service.get_user_by_username(username)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return user.id
-
-
 @router.post("/", response_model=OrderResponse)
 def create_order(
     order_data: OrderCreate,
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(current_user_id)
 ):
     """Create a new order."""
     order_service = OrderService()
@@ -55,7 +26,7 @@ def create_order(
 @router.get("/", response_model=List[OrderResponse])
 def get_user_orders(
     status: Optional[OrderStatus] = Query(None, description="Filter by order status"),
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(current_user_id)
 ):
     """Get all orders for the current user."""
     order_service = OrderService()
@@ -66,7 +37,7 @@ def get_user_orders(
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(current_user_id)
 ):
     """Get a specific order by ID."""
     order_service = OrderService()
@@ -77,7 +48,7 @@ def get_order(
 @router.delete("/{order_id}", response_model=OrderCancellationResponse)
 def cancel_order(
     order_id: int,
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(current_user_id)
 ):
     """Cancel an order."""
     order_service = OrderService()
@@ -100,32 +71,33 @@ def get_order_book(
     return order_book
 
 
-@router.get("/trades/{symbol}", response_model=List[TradeResponse])
+@router.get("/trades/{symbol}", response_model=Union[List[TradeResponse], TradeColumnsResponse])
 def get_recent_trades(
     symbol: str,
-    limit: int = Query(50, ge=1, le=1000, description="Number of trades to return")
+    limit: int = Query(50, ge=1, le=1000, description="Number of trades to return"),
+    columnar: bool = Query(False, description="Return one list per field instead of one object per trade")
 ):
     """Get recent trades for a specific symbol."""
     order_service = OrderService()
+    if columnar:
+        # Built from plain lists of native values, so hand it to orjson as is
+        # rather than validating it field by field
+        return ORJSONResponse(order_service.get_recent_trades_columnar(symbol, limit))
     trades = order_service.get_recent_trades(symbol, limit)
     return trades
 
 
 @router.get("/summary/", response_model=OrderSummary)
 def get_order_summary(
-    user_id: int = Depends(get_current_user_id)
+    user_id: int = Depends(current_user_id)
 ):
     """Get order summary for the current user."""
     order_service = OrderService()
-    
-    all_orders = order_service.get_user_orders(user_id)
-    pending_orders = order_service.get_user_orders(user_id, OrderStatus.PENDING)
-    filled_orders = order_service.get_user_orders(user_id, OrderStatus.FILLED)
-    cancelled_orders = order_service.get_user_orders(user_id, OrderStatus.CANCELLED)
+    counts = order_service.get_status_counts(user_id)
     
     return OrderSummary(
-        total_orders=len(all_orders),
-        pending_orders=len(pending_orders),
-        filled_orders=len(filled_orders),
-        cancelled_orders=len(cancelled_orders)
+        total_orders=sum(counts.values()),
+        pending_orders=counts.get(OrderStatus.PENDING.value, 0),
+        filled_orders=counts.get(OrderStatus.FILLED.value, 0),
+        cancelled_orders=counts.get(OrderStatus.CANCELLED.value, 0)
     ) 
\ No newline at end of file
@@ -1,6 +1,10 @@
-import json
 import asyncio
-from typing import Dict, List, Optional
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import msgspec
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException, status
 from fastapi.routing import APIRouter
 
@@ -10,6 +14,145 @@ import redis.asyncio as redis_async
 
 router = APIRouter()
 
+# Pub/sub updates arriving within this window are coalesced into one frame per symbol
+BATCH_WINDOW_SECONDS = 0.001
+BATCH_MAX_MESSAGES = 64
+
+# Encoded connect-time snapshots are shared by subscribers joining within this window
+SNAPSHOT_TTL_SECONDS = 0.1
+
+# Naive datetimes in order book payloads are UTC (datetime.utcnow)
+_DUMPS_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def _dumps(message: dict) -> str:
+    """Serialize an outgoing message to JSON text."""
+    # Sent as a text frame so browsers can JSON.parse(event.data) directly
+    return orjson.dumps(message, option=_DUMPS_OPTIONS).decode()
+
+
+_loads = orjson.loads
+
+# Wire formats, negotiated through the WebSocket subprotocol. Clients that
+# don't ask for one get JSON.
+CODEC_JSON = "json"
+CODEC_MSGPACK = "msgpack"
+SUBPROTOCOLS = (CODEC_MSGPACK, CODEC_JSON)
+
+_mp_encoder = msgspec.msgpack.Encoder()
+_mp_decoder = msgspec.msgpack.Decoder()
+
+# JSON frames are text, MessagePack frames binary
+Frame = Union[str, bytes]
+
+ENCODERS: Dict[str, Callable[[dict], Frame]] = {
+    CODEC_JSON: _dumps,
+    CODEC_MSGPACK: _mp_encoder.encode,
+}
+DECODERS: Dict[str, Callable[[bytes], dict]] = {
+    CODEC_JSON: _loads,
+    CODEC_MSGPACK: _mp_decoder.decode,
+}
+
+
+# Constant replies are encoded once at import
+PONG_FRAMES: Dict[str, Frame] = {
+    codec: encode({"type": "pong"}) for codec, encode in ENCODERS.items()
+}
+
+
+_JSON_ERROR_PREFIX = '{"type":"error","message":'
+
+
+@lru_cache(maxsize=256)
+def _error_frame(codec: str, message: str) -> Frame:
+    """Encode an error reply; repeated failures reuse the cached frame."""
+    if codec == CODEC_JSON:
+        # Only the message needs encoding (orjson escapes it); the rest is fixed
+        return _JSON_ERROR_PREFIX + orjson.dumps(message).decode() + "}"
+    return ENCODERS[codec]({"type": "error", "message": message})
+
+
+def negotiate_codec(websocket: WebSocket) -> Tuple[str, Optional[str]]:
+    """Pick the codec for a connection; returns (codec, subprotocol to accept)."""
+    offered = websocket.scope.get("subprotocols") or ()
+    for subprotocol in SUBPROTOCOLS:
+        if subprotocol in offered:
+            return subprotocol, subprotocol
+    return CODEC_JSON, None
+
+
+async def _receive_frame(websocket: WebSocket) -> Tuple[Frame, int]:
+    """Receive the next client frame as-is, binary or text, without transcoding.
+    
+    Returns the frame and its size in bytes; a text frame's UTF-8 length
+    can exceed its length in characters.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message["code"], message.get("reason"))
+    data = message.get("bytes")
+    if data is not None:
+        return data, len(data)
+    text = message["text"]
+    return text, len(text.encode())
+
+
+SendFn = Callable[[Frame], Awaitable[None]]
+ChannelView = Tuple[str, Tuple[WebSocket, ...], Tuple[SendFn, ...]]
+
+
+def _send_fn(websocket: WebSocket, codec: str) -> SendFn:
+    """Bound method sending ``codec`` frames: text for JSON, binary for MessagePack."""
+    return websocket.send_text if codec == CODEC_JSON else websocket.send_bytes
+
+
+class SymbolChannel:
+    """Subscribers of one symbol, grouped by codec for broadcast fan-out.
+    
+    Sockets and their pre-bound send methods are keyed by
+    ``id(websocket)`` so connect/disconnect are O(1). Broadcasts iterate
+    tuple views that are rebuilt lazily after membership changes, so a
+    send that suspends never sees the dicts change underneath it.
+    """
+    
+    __slots__ = ("conns", "send_fns", "_views")
+    
+    def __init__(self):
+        self.conns: Dict[str, Dict[int, WebSocket]] = {}
+        self.send_fns: Dict[str, Dict[int, SendFn]] = {}
+        self._views: Optional[Tuple[ChannelView, ...]] = None
+    
+    def __len__(self) -> int:
+        return sum(len(conns) for conns in self.conns.values())
+    
+    def add(self, websocket: WebSocket, codec: str = CODEC_JSON):
+        key = id(websocket)
+        self.conns.setdefault(codec, {})[key] = websocket
+        self.send_fns.setdefault(codec, {})[key] = _send_fn(websocket, codec)
+        self._views = None
+    
+    def remove(self, websocket: WebSocket) -> bool:
+        """Remove a subscriber; returns False if it was not subscribed."""
+        key = id(websocket)
+        for codec, codec_conns in self.conns.items():
+            if codec_conns.pop(key, None) is not None:
+                del self.send_fns[codec][key]
+                if not codec_conns:
+                    del self.conns[codec], self.send_fns[codec]
+                self._views = None
+                return True
+        return False
+    
+    def views(self) -> Tuple[ChannelView, ...]:
+        """Return (codec, sockets, send methods) snapshots for a broadcast."""
+        if self._views is None:
+            self._views = tuple(
+                (codec, tuple(codec_conns.values()), tuple(self.send_fns[codec].values()))
+                for codec, codec_conns in self.conns.items()
+            )
+        return self._views
+
 
 class ConnectionManager:
     """Manage WebSocket connections for real-time updates with connection limits and pooling."""
@@ -17,115 +160,116 @@ class ConnectionManager:
     def __init__(self, 
                  max_connections_per_symbol: int = 1000, 
                  max_total_connections: int = 10000,
-                 redis_pool_size: int = 100):
+                 redis_pool_size: int = 100,
+                 max_frame_size: int = 4096):
         self.max_connections_per_symbol = max_connections_per_symbol
         self.max_total_connections = max_total_connections
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Client requests are tiny; anything larger is rejected before parsing
+        self.max_frame_size = max_frame_size
+        self.active_connections: Dict[str, SymbolChannel] = {}
         self.total_connections = 0
         self.redis_pool: Optional[redis_async.ConnectionPool] = None
         self.redis_client: Optional[redis_async.Redis] = None
         self._redis_connected = False
         self.redis_pool_size = redis_pool_size
+        self._redis_url = redis_config.ssl_url if redis_config.ssl else redis_config.url
+        # Created on first use so it binds to the running event loop
+        self._connect_lock: Optional[asyncio.Lock] = None
         
-        # Statistics tracking
-        self.stats = {
-            "total_connections": 0,
-            "symbols_count": 0,
-            "connections_per_symbol": {},
-            "messages_sent": 0,
-            "errors_count": 0
-        }
+        # Statistics tracking (plain counters; get_stats() builds the report)
+        self._messages_sent = 0
+        self._errors_count = 0
+        
+        # (symbol, codec) -> (monotonic time, encoded order_book_snapshot frame)
+        self._snapshot_cache: Dict[Tuple[str, str], Tuple[float, Frame]] = {}
     
-    async def connect(self, websocket: WebSocket, symbol: str):
+    def _snapshot_frame(self, symbol: str, codec: str) -> Frame:
+        """Return the encoded order book snapshot, reusing one younger than the TTL."""
+        key = (symbol, codec)
+        now = time.monotonic()
+        cached = self._snapshot_cache.get(key)
+        if cached is not None and now - cached[0] < SNAPSHOT_TTL_SECONDS:
+            return cached[1]
+        
+        order_book = redis_order_book.get_order_book(symbol, depth=20)
+        frame = ENCODERS[codec]({
+            "type": "order_book_snapshot",
+            "data": order_book
+        })
+        self._snapshot_cache[key] = (now, frame)
+        return frame
+    
+    def _invalidate_snapshots(self, symbol: str):
+        """Drop cached snapshots for a symbol after its book changed."""
+        for codec in SUBPROTOCOLS:
+            self._snapshot_cache.pop((symbol, codec), None)
+    
+    async def connect(self, websocket: WebSocket, symbol: str, codec: str = CODEC_JSON,
+                      subprotocol: Optional[str] = None):
         """Connect a WebSocket for a specific symbol with connection limits."""
         # Check connection limits
         if self.total_connections >= self.max_total_connections:
             await websocket.close(code=1008, reason="Maximum total connections reached")
             return
         
-        symbol_connections = len(self.active_connections.get(symbol, []))
+        symbol_connections = len(self.active_connections.get(symbol, ()))
         if symbol_connections >= self.max_connections_per_symbol:
             await websocket.close(code=1008, reason="Maximum connections for symbol reached")
             return
         
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
         
         if symbol not in self.active_connections:
-            self.active_connections[symbol] = []
+            self.active_connections[symbol] = SymbolChannel()
         
-        self.active_connections[symbol].append(websocket)
+        self.active_connections[symbol].add(websocket, codec)
         self.total_connections += 1
         
-        # Update statistics
-        self.stats["total_connections"] = self.total_connections
-        self.stats["symbols_count"] = len(self.active_connections)
-        self.stats["connections_per_symbol"][symbol] = len(self.active_connections[symbol])
-        
         # Send initial order book snapshot
+        send = _send_fn(websocket, codec)
         try:
-            order_book = redis_order_book.get_order_book(symbol, depth=20)
-            await websocket.send_text(json.dumps({
-                "type": "order_book_snapshot",
-                "data": order_book
-            }))
-            self.stats["messages_sent"] += 1
+            await send(self._snapshot_frame(symbol, codec))
+            self._messages_sent += 1
         except Exception as e:
             # Send error message if order book unavailable
-            await websocket.send_text(json.dumps({
-                "type": "error",
-                "message": f"Failed to get order book: {str(e)}"
-            }))
-            self.stats["errors_count"] += 1
+            await send(_error_frame(codec, f"Failed to get order book: {str(e)}"))
+            self._errors_count += 1
     
     def disconnect(self, websocket: WebSocket, symbol: str):
         """Disconnect a WebSocket and update statistics."""
         if symbol in self.active_connections:
-            if websocket in self.active_connections[symbol]:
-                self.active_connections[symbol].remove(websocket)
+            if self.active_connections[symbol].remove(websocket):
                 self.total_connections -= 1
                 
-                # Update statistics
-                self.stats["total_connections"] = self.total_connections
-                self.stats["connections_per_symbol"][symbol] = len(self.active_connections[symbol])
-                
                 if not self.active_connections[symbol]:
                     del self.active_connections[symbol]
-                    self.stats["symbols_count"] = len(self.active_connections)
-                    if symbol in self.stats["connections_per_symbol"]:
-                        del self.stats["connections_per_symbol"][symbol]
-    
-    async def _send_to_connection(self, connection: WebSocket, message: dict) -> bool:
-        """Send message to a single connection with error handling."""
-        try:
-            await connection.send_text(json.dumps(message))
-            self.stats["messages_sent"] += 1
-            return True
-        except WebSocketDisconnect:
-            return False
-        except Exception as e:
-            print(f"Error sending to WebSocket: {e}")
-            self.stats["errors_count"] += 1
-            return False
+                    self._invalidate_snapshots(symbol)
     
     async def broadcast_to_symbol(self, symbol: str, message: dict):
-        """Broadcast message to all connections for a symbol using parallel execution."""
-        if symbol in self.active_connections:
-            connections = self.active_connections[symbol].copy()
+        """Broadcast message to all connections for a symbol."""
+        channel = self.active_connections.get(symbol)
+        if channel is not None:
+            views = channel.views()
             
-            # Create tasks for parallel sending
-            tasks = [
-                self._send_to_connection(connection, message)
-                for connection in connections
-            ]
+            # Serialize once per codec; every subscriber receives the same frame
+            sends = []
+            for codec, _, send_fns in views:
+                payload = ENCODERS[codec](message)
+                sends.extend(send(payload) for send in send_fns)
             
-            # Execute all sends in parallel
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Send concurrently so one peer with a full buffer can't stall the rest
+            results = await asyncio.gather(*sends, return_exceptions=True)
             
-            # Remove failed connections
+            connections = [connection for _, conns, _ in views for connection in conns]
             disconnected = []
-            for i, result in enumerate(results):
-                if result is False or isinstance(result, Exception):
-                    disconnected.append(connections[i])
+            for connection, result in zip(connections, results):
+                if result is None:
+                    continue
+                if not isinstance(result, WebSocketDisconnect):
+                    print(f"Error sending to WebSocket: {result}")
+                    self._errors_count += 1
+                disconnected.append(connection)
+            self._messages_sent += len(results) - len(disconnected)
             
             # Remove disconnected connections
             for connection in disconnected:
@@ -133,17 +277,26 @@ class ConnectionManager:
     
     async def _ensure_redis_connection(self):
         """Ensure Redis connection pool is established."""
-        if not self._redis_connected:
+        if self._redis_connected:
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._redis_connected:
+                return
             try:
-                # Create Redis connection pool
-                self.redis_pool = redis_async.ConnectionPool.from_url(
-                    redis_config.url if not redis_config.ssl else redis_config.ssl_url,
-                    max_connections=self.redis_pool_size,
-                    decode_responses=True
-                )
-                
-                # Create Redis client with pool
-                self.redis_client = redis_async.Redis(connection_pool=self.redis_pool)
+                # The pool is created once and reused across reconnects; raw bytes
+                # responses go straight to the decoders
+                if self.redis_client is None:
+                    self.redis_pool = redis_async.ConnectionPool.from_url(
+                        self._redis_url,
+                        max_connections=self.redis_pool_size,
+                        decode_responses=False,
+                        socket_keepalive=True,
+                        health_check_interval=30,
+                        retry_on_timeout=True
+                    )
+                    self.redis_client = redis_async.Redis(connection_pool=self.redis_pool)
                 
                 # Test connection
                 await self.redis_client.ping()
@@ -155,7 +308,8 @@ class ConnectionManager:
                 raise
     
     async def start_redis_listener(self):
-        """Start listening to Redis pub/sub for order updates."""
+        """Start listening to Redis pub/sub for order and trade updates."""
+        pubsub = None
         try:
             await self._ensure_redis_connection()
             
@@ -164,29 +318,65 @@ class ConnectionManager:
                 
             pubsub = self.redis_client.pubsub()
             
-            # Subscribe to order updates for all symbols
-            await pubsub.psubscribe("order_updates:*")
+            # Subscribe to order and trade updates for all symbols
+            await pubsub.psubscribe("order_updates:*", "trade_updates:*")
             
             print("✅ Redis pub/sub listener started")
             
-            async for message in pubsub.listen():
-                if message["type"] == "pmessage":
-                    symbol = message["channel"].split(":")[1]
-                    data = json.loads(message["data"])
-                    
-                    # Broadcast to all connections for this symbol
+            loop = asyncio.get_running_loop()
+            while True:
+                # Block until an update arrives, then drain whatever follows
+                # within the batch window
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if message is None:
+                    continue
+                batches: Dict[str, List[dict]] = {}
+                trade_batches: Dict[str, List[dict]] = {}
+                count = 0
+                deadline = loop.time() + BATCH_WINDOW_SECONDS
+                while message is not None:
+                    if message["type"] == "pmessage":
+                        prefix, _, symbol = message["channel"].partition(b":")
+                        symbol = symbol.decode()
+                        if prefix == b"trade_updates":
+                            # One message already carries every fill of a match
+                            trade_batches.setdefault(symbol, []).extend(_loads(message["data"]))
+                        else:
+                            batches.setdefault(symbol, []).append(_loads(message["data"]))
+                        count += 1
+                    remaining = deadline - loop.time()
+                    if count >= BATCH_MAX_MESSAGES or remaining <= 0:
+                        break
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                
+                # Broadcast to all connections for each symbol
+                for symbol, updates in batches.items():
+                    self._invalidate_snapshots(symbol)
+                    if len(updates) == 1:
+                        await self.broadcast_to_symbol(symbol, {
+                            "type": "order_update",
+                            "data": updates[0]
+                        })
+                    else:
+                        await self.broadcast_to_symbol(symbol, {
+                            "type": "order_update_batch",
+                            "data": updates
+                        })
+                
+                for symbol, trades in trade_batches.items():
                     await self.broadcast_to_symbol(symbol, {
-                        "type": "order_update",
-                        "data": data
+                        "type": "trades",
+                        "data": trades
                     })
                     
         except Exception as e:
             print(f"Redis listener error: {e}")
             self._redis_connected = False
-            self.stats["errors_count"] += 1
+            self._errors_count += 1
         finally:
-            if self.redis_client:
-                await self.redis_client.close()
+            # Release the pub/sub connection; the shared pool stays open
+            if pubsub is not None:
+                await pubsub.aclose()
     
     def get_stats(self) -> dict:
         """Get current connection statistics."""
@@ -194,9 +384,11 @@ class ConnectionManager:
             "total_connections": self.total_connections,
             "max_total_connections": self.max_total_connections,
             "symbols_count": len(self.active_connections),
-            "connections_per_symbol": self.stats["connections_per_symbol"].copy(),
-            "messages_sent": self.stats["messages_sent"],
-            "errors_count": self.stats["errors_count"],
+            "connections_per_symbol": {
+                symbol: len(channel) for symbol, channel in self.active_connections.items()
+            },
+            "messages_sent": self._messages_sent,
+            "errors_count": self._errors_count,
             "redis_connected": self._redis_connected,
             "connection_utilization": {
                 "total_percent": (self.total_connections / self.max_total_connections) * 100,
@@ -209,69 +401,82 @@ class ConnectionManager:
     
     def reset_stats(self):
         """Reset message and error statistics."""
-        self.stats["messages_sent"] = 0
-        self.stats["errors_count"] = 0
+        self._messages_sent = 0
+        self._errors_count = 0
 
 
 # Global connection manager with optimized settings
 manager = ConnectionManager(
     max_connections_per_symbol=1000,
     max_total_connections=10000,
-    redis_pool_size=100
+    redis_pool_size=100,
+    max_frame_size=4096
 )
 
 
 @router.websocket("/ws/orderbook/{symbol}")
 async def websocket_orderbook(websocket: WebSocket, symbol: str):
-    """WebSocket endpoint for real-time order book updates."""
-    await manager.connect(websocket, symbol)
+    """WebSocket endpoint for real-time order book updates.
+    
+    Clients may request the ``msgpack`` subprotocol to exchange MessagePack
+    binary frames; otherwise frames are JSON.
+    """
+    codec, subprotocol = negotiate_codec(websocket)
+    encode, decode = ENCODERS[codec], DECODERS[codec]
+    send = _send_fn(websocket, codec)
+    pong_frame = PONG_FRAMES[codec]
+    await manager.connect(websocket, symbol, codec, subprotocol)
     
     try:
         while True:
             # Keep connection alive and handle any client messages
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            data, size = await _receive_frame(websocket)
+            if size > manager.max_frame_size:
+                await websocket.close(code=1009, reason="Message too big")
+                manager.disconnect(websocket, symbol)
+                return
+            message = decode(data)
             
             # Handle client requests
             if message.get("type") == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
-                manager.stats["messages_sent"] += 1
+                await send(pong_frame)
+                manager._messages_sent += 1
             elif message.get("type") == "get_order_book":
                 try:
                     depth = message.get("depth", 10)
                     order_book = redis_order_book.get_order_book(symbol, depth)
-                    await websocket.send_text(json.dumps({
+                    await send(encode({
                         "type": "order_book_update",
                         "data": order_book
                     }))
-                    manager.stats["messages_sent"] += 1
+                    manager._messages_sent += 1
                 except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": f"Failed to get order book: {str(e)}"
-                    }))
-                    manager.stats["errors_count"] += 1
+                    await send(
+                        _error_frame(codec, f"Failed to get order book: {str(e)}")
+                    )
+                    manager._errors_count += 1
             elif message.get("type") == "get_recent_trades":
                 try:
                     limit = message.get("limit", 50)
                     trades = redis_order_book.get_recent_trades(symbol, limit)
-                    await websocket.send_text(json.dumps({
+                    # Trade is a dataclass; both codecs encode it without an
+                    # intermediate dict per trade
+                    await send(encode({
                         "type": "recent_trades",
-                        "data": [trade.to_dict() for trade in trades]
+                        "data": trades
                     }))
-                    manager.stats["messages_sent"] += 1
+                    manager._messages_sent += 1
                 except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": f"Failed to get trades: {str(e)}"
-                    }))
-                    manager.stats["errors_count"] += 1
+                    await send(
+                        _error_frame(codec, f"Failed to get trades: {str(e)}")
+                    )
+                    manager._errors_count += 1
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket, symbol)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.stats["errors_count"] += 1
+        manager._errors_count += 1
         manager.disconnect(websocket, symbol)
 
 
@@ -312,7 +517,7 @@ async def start_redis_listener_task():
             await manager.start_redis_listener()
         except Exception as e:
             print(f"Redis listener failed, retrying in 5 seconds: {e}")
-            manager.stats["errors_count"] += 1
+            manager._errors_count += 1
             await asyncio.sleep(5)
 
 
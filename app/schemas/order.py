@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -33,7 +33,13 @@ class OrderBase(BaseModel):
 
 
 class OrderCreate(OrderBase):
-    pass
+    @model_validator(mode="after")
+    def check_prices(self) -> "OrderCreate":
+        if self.order_type == OrderType.LIMIT and not self.price:
+            raise ValueError("Limit orders must have a price")
+        if self.order_type == OrderType.STOP and not self.stop_price:
+            raise ValueError("Stop orders must have a stop price")
+        return self
 
 
 class OrderUpdate(BaseModel):
@@ -50,8 +56,7 @@ class OrderResponse(OrderBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderBookEntry(BaseModel):
@@ -59,8 +64,7 @@ class OrderBookEntry(BaseModel):
     total_quantity: float
     order_count: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderBookResponse(BaseModel):
@@ -79,8 +83,18 @@ class TradeResponse(BaseModel):
     price: float
     executed_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TradeColumnsResponse(BaseModel):
+    """Recent trades as parallel columns; index i of each list is one trade."""
+    symbol: str
+    ids: List[int]
+    buy_order_ids: List[int]
+    sell_order_ids: List[int]
+    quantities: List[float]
+    prices: List[float]
+    executed_at: List[datetime]
 
 
 class OrderCancellationResponse(BaseModel):
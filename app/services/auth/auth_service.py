@@ -1,38 +1,38 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Optional
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, Token
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash, verify_and_update_password, create_access_token
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def register_user(self, user_data: UserCreate) -> User:
+    async def register_user(self, user_data: UserCreate) -> User:
         """Register a new user."""
-        # Check if user already exists
-        existing_user = self.db.query(User).filter(
-            (User.email == user_data.email) | (User.username == user_data.username)
-        ).first()
+        # Check if user already exists (one unique-index probe per column)
+        email = user_data.email
+        if await self.db.scalar(lambda_stmt(lambda: select(exists().where(User.email == email)))):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         
-        if existing_user:
-            if existing_user.email == user_data.email:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already taken"
-                )
+        username = user_data.username
+        if await self.db.scalar(lambda_stmt(lambda: select(exists().where(User.username == username)))):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already taken"
+            )
         
-        # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        # Create new user (hashing is CPU-bound, keep it off the event loop)
+        hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -41,36 +41,44 @@ class AuthService:
         )
         
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         
         return db_user
 
-    def authenticate_user(self, user_data: UserLogin) -> Optional[User]:
+    async def authenticate_user(self, user_data: UserLogin) -> Optional[User]:
         """Authenticate user with email and password."""
-        user = self.db.query(User).filter(User.email == user_data.email).first()
+        user = await self.get_user_by_email(user_data.email)
         
         if not user:
             return None
         
-        if not verify_password(user_data.password, user.hashed_password):
+        verified, new_hash = await run_in_threadpool(
+            verify_and_update_password, user_data.password, user.hashed_password
+        )
+        if not verified:
             return None
         
+        # Upgrade hashes made with a deprecated scheme (e.g. bcrypt -> argon2)
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            await self.db.commit()
+        
         return user
 
     def create_access_token(self, user: User) -> Token:
         """Create access token for authenticated user."""
         access_token_expires = timedelta(minutes=30)
         access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
+            data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
         )
         
         return Token(access_token=access_token, token_type="bearer")
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
+    async def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return self.db.query(User).filter(User.username == username).first()
+        return await self.db.scalar(lambda_stmt(lambda: select(User).where(User.username == username)))
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first() 
\ No newline at end of file
+        return await self.db.scalar(lambda_stmt(lambda: select(User).where(User.email == email)))
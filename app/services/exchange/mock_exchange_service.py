@@ -4,34 +4,41 @@ import time
 
 class MockExchangeService:
     def __init__(self):
-        self.coins = {
+        coins = {
             'BTC/USD': 30000.0,
             'ETH/USD': 2000.0,
             'SOL/USD': 150.0,
             'DOGE/USD': 0.15,
             'BNB/USD': 250.0
         }
-        self.lock = threading.Lock()
+        # Symbols are fixed; prices live in a parallel list updated in one pass
+        self.symbols = tuple(coins)
+        self.prices = list(coins.values())
+        # Readers get this dict; the writer replaces it, never mutates it
+        self._snapshot = dict(coins)
         self.running = True
         self.update_thread = threading.Thread(target=self._update_prices, daemon=True)
         self.update_thread.start()
 
     def _update_prices(self):
+        uniform = random.uniform
         while self.running:
-            with self.lock:
-                for symbol in self.coins:
-                    # Simulate price change: random walk
-                    change = random.uniform(-0.5, 0.5) * self.coins[symbol] * 0.01
-                    self.coins[symbol] = max(0.01, self.coins[symbol] + change)
+            # Simulate price change: random walk of up to +/-0.5% per tick
+            self.prices = [
+                max(0.01, price * (1.0 + uniform(-0.005, 0.005)))
+                for price in self.prices
+            ]
+            # Publish with a single attribute rebind, which is atomic
+            self._snapshot = dict(zip(self.symbols, self.prices))
             time.sleep(2)  # Update every 2 seconds
 
     def get_prices(self):
-        with self.lock:
-            return self.coins.copy()
+        """Return the latest prices; the dict is shared, so treat it as read-only."""
+        return self._snapshot
 
     def stop(self):
         self.running = False
         self.update_thread.join()
 
 # Global instance
-mock_exchange = MockExchangeService() 
\ No newline at end of file
+mock_exchange = MockExchangeService()
@@ -1,9 +1,9 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from fastapi import HTTPException, status
 
 from app.services.trading_engine.redis_order_book import redis_order_book, OrderSide, OrderType, OrderStatus
-from app.schemas.order import OrderCreate, OrderUpdate, OrderBookResponse, TradeResponse, OrderType as SchemaOrderType
+from app.schemas.order import OrderCreate, OrderUpdate, OrderBookResponse, TradeResponse
 
 
 class OrderService:
@@ -12,22 +12,12 @@ class OrderService:
         self.order_book = redis_order_book
 
     def create_order(self, user_id: int, order_data: OrderCreate) -> dict:
-        """Create a new order and add it to the order book."""
-        # Validate order data
-        if order_data.order_type == SchemaOrderType.LIMIT and not order_data.price:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Limit orders must have a price"
-            )
+        """Create a new order and add it to the order book.
         
-        if order_data.order_type == SchemaOrderType.STOP and not order_data.stop_price:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Stop orders must have a stop price"
-            )
-
-        # Convert schema enums to order book enums
-        side = OrderSide.BUY if order_data.side.value == "buy" else OrderSide.SELL
+        Price requirements per order type are enforced by OrderCreate itself.
+        """
+        # Schema and order book enums share values, so convert by value lookup
+        side = OrderSide(order_data.side.value)
         order_type = OrderType(order_data.order_type.value)
 
         # Create the order using Redis order book
@@ -48,6 +38,11 @@ class OrderService:
         orders = self.order_book.get_user_orders(user_id, status)
         return [self._order_to_dict(order) for order in orders]
 
+    def get_status_counts(self, user_id: int) -> Dict[str, int]:
+        """Get the number of orders per status for a specific user."""
+        counts = self.order_book.get_user_order_status_counts(user_id)
+        return {order_status.value: count for order_status, count in counts.items()}
+
     def get_order(self, order_id: int, user_id: int) -> dict:
         """Get a specific order by ID."""
         try:
@@ -86,6 +81,19 @@ class OrderService:
         trades = self.order_book.get_recent_trades(symbol, limit)
         return [self._trade_to_dict(trade) for trade in trades]
 
+    def get_recent_trades_columnar(self, symbol: str, limit: int = 50) -> dict:
+        """Get recent trades for a symbol as one list per field."""
+        trades = self.order_book.get_recent_trades(symbol, limit)
+        return {
+            "symbol": symbol,
+            "ids": [trade.id for trade in trades],
+            "buy_order_ids": [trade.buy_order_id for trade in trades],
+            "sell_order_ids": [trade.sell_order_id for trade in trades],
+            "quantities": [trade.quantity for trade in trades],
+            "prices": [trade.price for trade in trades],
+            "executed_at": [trade.executed_at for trade in trades]
+        }
+
     def _order_to_dict(self, order) -> dict:
         """Convert order object to dictionary."""
         return {
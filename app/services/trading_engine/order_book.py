@@ -1,95 +1,217 @@
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass, field
-from enum import Enum
-import heapq
+import time
+from enum import IntEnum, IntFlag
 from collections import defaultdict
+import sys
 
+from sortedcontainers import SortedDict
 
-class OrderSide(Enum):
-    BUY = "buy"
-    SELL = "sell"
 
+# Price precision per symbol, as ticks per unit of quote currency. Prices are
+# held as integer tick counts inside the book so level keys hash and compare
+# exactly; symbols not listed use DEFAULT_TICKS_PER_UNIT (8 decimals).
+DEFAULT_TICKS_PER_UNIT = 100_000_000
+TICK_SIZE_PER_SYMBOL: Dict[str, int] = {
+    "BTC/USD": 100,
+    "ETH/USD": 100,
+    "SOL/USD": 100,
+    "BNB/USD": 100,
+}
 
-class OrderType(Enum):
-    MARKET = "market"
-    LIMIT = "limit"
-    STOP = "stop"
 
+def price_to_ticks(symbol: str, price: float) -> int:
+    """Convert a price to an integer number of ticks for ``symbol``."""
+    return int(round(price * TICK_SIZE_PER_SYMBOL.get(symbol, DEFAULT_TICKS_PER_UNIT)))
 
-class OrderStatus(Enum):
-    PENDING = "pending"
-    PARTIAL = "partial"
-    FILLED = "filled"
-    CANCELLED = "cancelled"
+
+def ticks_to_price(symbol: str, ticks: int) -> float:
+    """Convert a tick count back to a price for ``symbol``."""
+    return ticks / TICK_SIZE_PER_SYMBOL.get(symbol, DEFAULT_TICKS_PER_UNIT)
+
+
+# Integer enums compare as plain ints in the matching loop. Statuses are bit
+# flags so "still open" is a single AND against LIVE_STATUSES.
+class OrderSide(IntEnum):
+    BUY = 0
+    SELL = 1
+
+
+class OrderType(IntEnum):
+    MARKET = 0
+    LIMIT = 1
+    STOP = 2
+
+
+class OrderStatus(IntFlag):
+    PENDING = 1
+    PARTIAL = 2
+    FILLED = 4
+    CANCELLED = 8
+
+
+LIVE_STATUSES = OrderStatus.PENDING | OrderStatus.PARTIAL
 
 
-@dataclass
 class Order:
-    id: int
-    user_id: int
-    symbol: str
-    side: OrderSide
-    order_type: OrderType
-    quantity: float
-    filled_quantity: float = 0.0
-    price: Optional[float] = None
-    stop_price: Optional[float] = None
-    status: OrderStatus = OrderStatus.PENDING
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    """Order resting in or matched by the in-memory book.
+    
+    Slotted by hand rather than through ``@dataclass(slots=True)``, which
+    needs Python 3.10; there are millions of these at depth.
+    """
+    
+    __slots__ = (
+        "id", "user_id", "symbol", "side", "order_type", "quantity",
+        "filled_quantity", "price", "price_ticks", "stop_price", "status",
+        "created_at", "updated_at",
+    )
+    
+    def __init__(self, id: int, user_id: int, symbol: str, side: OrderSide,
+                 order_type: OrderType, quantity: float,
+                 filled_quantity: float = 0.0, price: Optional[float] = None,
+                 stop_price: Optional[float] = None,
+                 status: OrderStatus = OrderStatus.PENDING,
+                 created_at: Optional[int] = None,
+                 updated_at: Optional[int] = None):
+        self.id = id
+        self.user_id = user_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.quantity = quantity
+        self.filled_quantity = filled_quantity
+        self.price = price
+        # Set by the book for priced orders; all matching works on this
+        self.price_ticks: Optional[int] = None
+        self.stop_price = stop_price
+        self.status = status
+        # Wall-clock nanoseconds since the epoch
+        self.created_at = created_at or time.time_ns()
+        self.updated_at = updated_at or self.created_at
+
+
+class Node:
+    """Link in a price level's queue of resting orders."""
+    
+    __slots__ = ("order", "prev", "next")
+    
+    def __init__(self, order: Order):
+        self.order = order
+        self.prev: Optional["Node"] = None
+        self.next: Optional["Node"] = None
 
 
-@dataclass
 class OrderBookEntry:
-    price: float
-    total_quantity: float
-    order_count: int
-    orders: List[Order] = field(default_factory=list)
+    """Aggregate and FIFO queue of the orders resting at one price."""
+    
+    __slots__ = ("price", "total_quantity", "order_count", "head", "tail")
+    
+    def __init__(self, price: int, total_quantity: float, order_count: int):
+        self.price = price
+        self.total_quantity = total_quantity
+        self.order_count = order_count
+        # Doubly-linked FIFO of resting orders; head has time priority
+        self.head: Optional[Node] = None
+        self.tail: Optional[Node] = None
+    
+    def append(self, node: Node):
+        """Queue a node behind the level's existing orders."""
+        node.prev = self.tail
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+    
+    def unlink(self, node: Node):
+        """Remove a node from anywhere in the queue in O(1)."""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
 
 
-@dataclass
 class Trade:
-    id: int
-    symbol: str
-    buy_order_id: int
-    sell_order_id: int
-    quantity: float
-    price: float
-    executed_at: datetime = field(default_factory=datetime.utcnow)
+    __slots__ = (
+        "id", "symbol", "buy_order_id", "sell_order_id",
+        "quantity", "price", "executed_at",
+    )
+    
+    def __init__(self, id: int, symbol: str, buy_order_id: int,
+                 sell_order_id: int, quantity: float, price: float,
+                 executed_at: Optional[int] = None):
+        self.id = id
+        self.symbol = symbol
+        self.buy_order_id = buy_order_id
+        self.sell_order_id = sell_order_id
+        self.quantity = quantity
+        self.price = price
+        # Wall-clock nanoseconds since the epoch
+        self.executed_at = executed_at or time.time_ns()
 
 
 class OrderBook:
     """
     In-memory order book implementation using Python objects.
-    Uses heaps for efficient price level management.
+    
+    Prices are integer ticks (see ``price_to_ticks``). Each side of a symbol
+    is a SortedDict of price levels keyed best-first: asks by their ticks,
+    bids by their negated ticks. The best level of either side is the first
+    item, and adding or dropping a level is O(log P).
     """
     
     def __init__(self):
         # Order storage
         self.orders: Dict[int, Order] = {}
+        # Queue nodes of resting orders, for O(1) removal on cancel/fill
+        self.order_nodes: Dict[int, Node] = {}
+        # Orders per user in creation order; ids only grow, so appending keeps
+        # each list sorted without a sort on read
+        self.user_orders: Dict[int, List[Order]] = defaultdict(list)
         self.next_order_id = 1
         self.next_trade_id = 1
         
-        # Order book by symbol
-        # bids: max heap (negative prices for max heap behavior)
-        # asks: min heap (positive prices)
-        self.order_books: Dict[str, Dict[str, List[Tuple[float, float]]]] = defaultdict(
-            lambda: {"bids": [], "asks": []}
-        )
+        # Per-symbol state below is allocated once by register_symbol
         
-        # Price level details by symbol
-        self.price_levels: Dict[str, Dict[str, Dict[float, OrderBookEntry]]] = defaultdict(
-            lambda: {"bids": {}, "asks": {}}
-        )
+        # Price levels by symbol; keys are ticks for asks, -ticks for bids
+        self.price_levels: Dict[str, Dict[str, SortedDict]] = {}
         
         # Trades by symbol
-        self.trades: Dict[str, List[Trade]] = defaultdict(list)
+        self.trades: Dict[str, List[Trade]] = {}
+        
+        # Last computed top of book per side, as (depth, levels, edge key);
+        # reused by get_order_book until a mutation within it marks the side
+        # dirty. The edge key is the worst cached level's key, or None when
+        # the side had fewer than ``depth`` levels.
+        self._top_cache: Dict[str, Dict[str, Tuple[int, List[Dict], Optional[int]]]] = {}
+        self._cache_dirty: Dict[str, Dict[str, bool]] = {}
+    
+    def register_symbol(self, symbol: str) -> str:
+        """Allocate the book for ``symbol`` if needed; returns the interned symbol.
+        
+        Orders keep the interned string, so the per-symbol dict lookups on
+        the matching path compare by identity.
+        """
+        symbol = sys.intern(symbol)
+        if symbol not in self.price_levels:
+            self.price_levels[symbol] = {"bids": SortedDict(), "asks": SortedDict()}
+            self.trades[symbol] = []
+            self._top_cache[symbol] = {}
+            self._cache_dirty[symbol] = {"bids": True, "asks": True}
+        return symbol
     
     def add_order(self, user_id: int, symbol: str, side: OrderSide, 
                   order_type: OrderType, quantity: float, 
                   price: Optional[float] = None, stop_price: Optional[float] = None) -> Order:
         """Add a new order to the order book."""
+        symbol = self.register_symbol(symbol)
+        # One clock read covers the order and every fill it produces
+        now = time.time_ns()
         order = Order(
             id=self.next_order_id,
             user_id=user_id,
@@ -98,18 +220,22 @@ class OrderBook:
             order_type=order_type,
             quantity=quantity,
             price=price,
-            stop_price=stop_price
+            stop_price=stop_price,
+            created_at=now
         )
+        if price is not None:
+            order.price_ticks = price_to_ticks(symbol, price)
         
         self.next_order_id += 1
         self.orders[order.id] = order
-        
-        # Add to order book if it's a limit order
-        if order_type == OrderType.LIMIT and price:
-            self._add_to_order_book(order)
+        self.user_orders[user_id].append(order)
         
         # Try to match the order
-        self._match_order(order)
+        self._match_order(order, now)
+        
+        # Rest the unfilled part on the book if it's a limit order
+        if order_type == OrderType.LIMIT and price and order.status != OrderStatus.FILLED:
+            self._add_to_order_book(order)
         
         return order
     
@@ -122,11 +248,11 @@ class OrderBook:
         if order.user_id != user_id:
             raise ValueError("Order does not belong to user")
         
-        if order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED]:
-            raise ValueError(f"Cannot cancel order with status: {order.status}")
+        if not order.status & LIVE_STATUSES:
+            raise ValueError(f"Cannot cancel order with status: {order.status.name}")
         
         order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
+        order.updated_at = time.time_ns()
         
         # Remove from order book if it was a limit order
         if order.order_type == OrderType.LIMIT and order.price:
@@ -146,44 +272,25 @@ class OrderBook:
         return order
     
     def get_user_orders(self, user_id: int, status: Optional[OrderStatus] = None) -> List[Order]:
-        """Get orders for a specific user."""
-        user_orders = [order for order in self.orders.values() if order.user_id == user_id]
+        """Get orders for a specific user.
         
-        if status:
-            user_orders = [order for order in user_orders if order.status == status]
+        ``status`` may combine flags, e.g. LIVE_STATUSES for all open orders.
+        """
+        user_orders = self.user_orders.get(user_id, [])
         
-        return sorted(user_orders, key=lambda x: x.created_at, reverse=True)
+        # Newest first, filtered in the same pass
+        if status is None:
+            return user_orders[::-1]
+        return [order for order in reversed(user_orders) if order.status & status]
     
     def get_order_book(self, symbol: str, depth: int = 10) -> Dict:
         """Get the order book for a specific symbol."""
-        bids = []
-        asks = []
-        
-        # Get bids (buy orders) - descending by price
-        bid_heap = self.order_books[symbol]["bids"].copy()
-        for _ in range(min(depth, len(bid_heap))):
-            if bid_heap:
-                price, _ = heapq.heappop(bid_heap)
-                entry = self.price_levels[symbol]["bids"].get(-price)  # Convert back from negative
-                if entry:
-                    bids.append({
-                        "price": entry.price,
-                        "total_quantity": entry.total_quantity,
-                        "order_count": entry.order_count
-                    })
-        
-        # Get asks (sell orders) - ascending by price
-        ask_heap = self.order_books[symbol]["asks"].copy()
-        for _ in range(min(depth, len(ask_heap))):
-            if ask_heap:
-                price, _ = heapq.heappop(ask_heap)
-                entry = self.price_levels[symbol]["asks"].get(price)
-                if entry:
-                    asks.append({
-                        "price": entry.price,
-                        "total_quantity": entry.total_quantity,
-                        "order_count": entry.order_count
-                    })
+        if symbol in self.price_levels:
+            # Bids descending by price, asks ascending
+            bids = self._top_levels(symbol, "bids", depth)
+            asks = self._top_levels(symbol, "asks", depth)
+        else:
+            bids, asks = [], []
         
         return {
             "symbol": symbol,
@@ -195,178 +302,190 @@ class OrderBook:
     def get_recent_trades(self, symbol: str, limit: int = 50) -> List[Trade]:
         """Get recent trades for a symbol."""
         trades = self.trades.get(symbol, [])
-        return sorted(trades, key=lambda x: x.executed_at, reverse=True)[:limit]
+        # Trades are appended in execution order, and fills of one match share
+        # executed_at; read the last ``limit`` backwards, newest first
+        return trades[:-limit - 1:-1]
+    
+    def _top_levels(self, symbol: str, side_key: str, depth: int) -> List[Dict]:
+        """Return the best ``depth`` levels of one side, from cache when clean."""
+        dirty = self._cache_dirty[symbol]
+        cached = self._top_cache[symbol].get(side_key)
+        if not dirty[side_key] and cached is not None and cached[0] >= depth:
+            return cached[1][:depth]
+        
+        levels = self.price_levels[symbol][side_key]
+        best = levels.values()[:depth]
+        top = [
+            {
+                "price": ticks_to_price(symbol, entry.price),
+                "total_quantity": entry.total_quantity,
+                "order_count": entry.order_count
+            }
+            for entry in best
+        ]
+        
+        edge_key = levels.keys()[depth - 1] if len(levels) >= depth > 0 else None
+        self._top_cache[symbol][side_key] = (depth, top, edge_key)
+        dirty[side_key] = False
+        return top[:]
+    
+    def _touch_level(self, symbol: str, side_key: str, key: int):
+        """Mark a side's cached top of book dirty if level ``key`` is inside it.
+        
+        Levels behind the cached edge can change freely; an add, remove or
+        resize at or in front of it shifts what the snapshot would show.
+        """
+        cached = self._top_cache[symbol].get(side_key)
+        if cached is None:
+            return
+        edge_key = cached[2]
+        if edge_key is None or key <= edge_key:
+            self._cache_dirty[symbol][side_key] = True
     
     def _add_to_order_book(self, order: Order):
-        """Add a limit order to the order book."""
-        side_key = "bids" if order.side == OrderSide.BUY else "asks"
-        price = order.price
-        
-        if side_key not in self.price_levels[order.symbol]:
-            self.price_levels[order.symbol][side_key] = {}
-        
-        if price not in self.price_levels[order.symbol][side_key]:
+        """Add the unfilled part of a limit order to the order book."""
+        is_buy = order.side == OrderSide.BUY
+        side_key = "bids" if is_buy else "asks"
+        price = order.price_ticks
+        key = -price if is_buy else price
+        remaining_quantity = order.quantity - order.filled_quantity
+        levels = self.price_levels[order.symbol][side_key]
+        
+        node = Node(order)
+        self.order_nodes[order.id] = node
+        self._touch_level(order.symbol, side_key, key)
+        
+        entry = levels.get(key)
+        if entry is None:
             # Create new price level
             entry = OrderBookEntry(
                 price=price,
-                total_quantity=order.quantity,
-                order_count=1,
-                orders=[order]
+                total_quantity=remaining_quantity,
+                order_count=1
             )
-            self.price_levels[order.symbol][side_key][price] = entry
-            
-            # Add to heap
-            heap_price = -price if order.side == OrderSide.BUY else price
-            heapq.heappush(self.order_books[order.symbol][side_key], (heap_price, price))
+            entry.append(node)
+            levels[key] = entry
         else:
             # Update existing price level
-            entry = self.price_levels[order.symbol][side_key][price]
-            entry.total_quantity += order.quantity
+            entry.total_quantity += remaining_quantity
             entry.order_count += 1
-            entry.orders.append(order)
+            entry.append(node)
     
     def _remove_from_order_book(self, order: Order):
         """Remove a limit order from the order book."""
-        side_key = "bids" if order.side == OrderSide.BUY else "asks"
-        price = order.price
+        is_buy = order.side == OrderSide.BUY
+        side_key = "bids" if is_buy else "asks"
+        key = -order.price_ticks if is_buy else order.price_ticks
+        levels = self.price_levels[order.symbol][side_key]
         
-        if price in self.price_levels[order.symbol][side_key]:
-            entry = self.price_levels[order.symbol][side_key][price]
-            entry.total_quantity -= order.quantity
-            entry.order_count -= 1
-            
-            # Remove the specific order from the list
-            entry.orders = [o for o in entry.orders if o.id != order.id]
-            
-            if entry.total_quantity <= 0 or entry.order_count <= 0:
-                # Remove price level
-                del self.price_levels[order.symbol][side_key][price]
-                
-                # Remove from heap (this is simplified - in production you'd want a more efficient approach)
-                heap_price = -price if order.side == OrderSide.BUY else price
-                self.order_books[order.symbol][side_key] = [
-                    (p, pr) for p, pr in self.order_books[order.symbol][side_key] 
-                    if pr != price
-                ]
-                heapq.heapify(self.order_books[order.symbol][side_key])
-    
-    def _match_order(self, order: Order):
-        """Match an order against the order book."""
-        if order.status != OrderStatus.PENDING:
+        node = self.order_nodes.pop(order.id, None)
+        if node is None:
             return
         
-        opposite_side = OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY
-        side_key = "asks" if order.side == OrderSide.BUY else "bids"
+        self._touch_level(order.symbol, side_key, key)
+        entry = levels[key]
+        entry.unlink(node)
+        entry.order_count -= 1
+        entry.total_quantity -= order.quantity - order.filled_quantity
         
-        remaining_quantity = order.quantity
+        if entry.order_count <= 0:
+            # Remove the empty price level
+            del levels[key]
+    
+    def _match_order(self, order: Order, now: int):
+        """Match an order against the order book, stamping fills with ``now`` (ns)."""
+        if order.status != OrderStatus.PENDING:
+            return
         
-        # Get matching orders
+        symbol = order.symbol
+        order_id = order.id
+        is_buy = order.side == OrderSide.BUY
+        side_key = "asks" if is_buy else "bids"
+        levels = self.price_levels[symbol][side_key]
+        # Buy orders match with sell orders at or below the buy price; sell
+        # orders match with buy orders at or above the sell price. With bids
+        # keyed by negated ticks both reduce to "level key <= key limit".
+        # Market orders get a limit no level key can exceed, so the loop
+        # needs no separate market-order test; any other order type is
+        # bounded by its price.
         if order.order_type == OrderType.MARKET:
-            matching_orders = self._get_matching_orders(order.symbol, opposite_side, remaining_quantity)
+            key_limit = sys.maxsize
         else:
-            matching_orders = self._get_matching_orders_with_price(
-                order.symbol, opposite_side, remaining_quantity, order.price, order.side
-            )
+            key_limit = order.price_ticks if is_buy else -order.price_ticks
         
-        # Execute trades
-        for matching_order in matching_orders:
-            if remaining_quantity <= 0:
+        remaining_quantity = order.quantity
+        # A match is atomic: every fill shares the timestamp, and the trades
+        # are appended to the symbol's history in one go at the end
+        trades = []
+        
+        # Bind everything the loop touches to locals; the trade id counter is
+        # written back once at the end
+        FILLED = OrderStatus.FILLED
+        PARTIAL = OrderStatus.PARTIAL
+        peek_best = levels.peekitem
+        remove = self._remove_from_order_book
+        add_trade = trades.append
+        dirty = self._cache_dirty[symbol]
+        next_trade_id = self.next_trade_id
+        
+        # Walk levels best-first, consuming each level's queue from the head
+        # until the order is filled or the book no longer crosses
+        while remaining_quantity > 0 and levels:
+            level_key, entry = peek_best(0)
+            if level_key > key_limit:
                 break
             
-            available_quantity = matching_order.quantity - matching_order.filled_quantity
-            trade_quantity = min(remaining_quantity, available_quantity)
-            trade_price = matching_order.price
-            
-            # Create trade record
-            if order.side == OrderSide.BUY:
-                buy_order_id = order.id
-                sell_order_id = matching_order.id
-            else:
-                buy_order_id = matching_order.id
-                sell_order_id = order.id
-            
-            trade = Trade(
-                id=self.next_trade_id,
-                symbol=order.symbol,
-                buy_order_id=buy_order_id,
-                sell_order_id=sell_order_id,
-                quantity=trade_quantity,
-                price=trade_price
-            )
-            self.next_trade_id += 1
-            self.trades[order.symbol].append(trade)
-            
-            # Update order quantities
-            order.filled_quantity += trade_quantity
-            matching_order.filled_quantity += trade_quantity
-            remaining_quantity -= trade_quantity
-            
-            # Update order statuses
-            if order.filled_quantity >= order.quantity:
-                order.status = OrderStatus.FILLED
-            else:
-                order.status = OrderStatus.PARTIAL
-            
-            if matching_order.filled_quantity >= matching_order.quantity:
-                matching_order.status = OrderStatus.FILLED
-                # Remove filled order from order book
-                if matching_order.order_type == OrderType.LIMIT:
-                    self._remove_from_order_book(matching_order)
-            else:
-                matching_order.status = OrderStatus.PARTIAL
-            
-            order.updated_at = datetime.utcnow()
-            matching_order.updated_at = datetime.utcnow()
-    
-    def _get_matching_orders(self, symbol: str, side: OrderSide, quantity: float) -> List[Order]:
-        """Get orders that can potentially match."""
-        matching_orders = []
-        side_key = "asks" if side == OrderSide.SELL else "bids"
-        
-        # Get all orders at this price level
-        for price, entry in self.price_levels[symbol][side_key].items():
-            for order in entry.orders:
-                if (order.status in [OrderStatus.PENDING, OrderStatus.PARTIAL] and 
-                    order.order_type == OrderType.LIMIT):
-                    matching_orders.append(order)
-        
-        # Sort by price (ascending for asks, descending for bids)
-        if side == OrderSide.SELL:
-            matching_orders.sort(key=lambda x: x.price)
-        else:
-            matching_orders.sort(key=lambda x: x.price, reverse=True)
-        
-        return matching_orders
-    
-    def _get_matching_orders_with_price(self, symbol: str, side: OrderSide, quantity: float,
-                                      price: float, order_side: OrderSide) -> List[Order]:
-        """Get orders that can match at the specified price."""
-        matching_orders = []
-        side_key = "asks" if side == OrderSide.SELL else "bids"
-        
-        for level_price, entry in self.price_levels[symbol][side_key].items():
-            # Check price condition
-            if order_side == OrderSide.BUY:
-                # Buy orders match with sell orders at or below the buy price
-                if level_price > price:
-                    continue
-            else:
-                # Sell orders match with buy orders at or above the sell price
-                if level_price < price:
-                    continue
-            
-            for order in entry.orders:
-                if (order.status in [OrderStatus.PENDING, OrderStatus.PARTIAL] and 
-                    order.order_type == OrderType.LIMIT):
-                    matching_orders.append(order)
-        
-        # Sort by price (ascending for asks, descending for bids)
-        if side == OrderSide.SELL:
-            matching_orders.sort(key=lambda x: x.price)
-        else:
-            matching_orders.sort(key=lambda x: x.price, reverse=True)
+            while remaining_quantity > 0 and entry.head is not None:
+                matching_order = entry.head.order
+                
+                available_quantity = matching_order.quantity - matching_order.filled_quantity
+                trade_quantity = min(remaining_quantity, available_quantity)
+                trade_price = matching_order.price
+                
+                # Create trade record
+                if is_buy:
+                    buy_order_id = order_id
+                    sell_order_id = matching_order.id
+                else:
+                    buy_order_id = matching_order.id
+                    sell_order_id = order_id
+                
+                add_trade(Trade(
+                    id=next_trade_id,
+                    symbol=symbol,
+                    buy_order_id=buy_order_id,
+                    sell_order_id=sell_order_id,
+                    quantity=trade_quantity,
+                    price=trade_price,
+                    executed_at=now
+                ))
+                next_trade_id += 1
+                
+                # Update order quantities
+                order.filled_quantity += trade_quantity
+                remaining_quantity -= trade_quantity
+                
+                # Update order statuses
+                order.status = FILLED if remaining_quantity <= 0 else PARTIAL
+                
+                if trade_quantity >= available_quantity:
+                    # Remove filled order from order book (before its fill is booked,
+                    # so the level sheds the order's whole remaining quantity)
+                    remove(matching_order)
+                    matching_order.filled_quantity += trade_quantity
+                    matching_order.status = FILLED
+                else:
+                    matching_order.filled_quantity += trade_quantity
+                    matching_order.status = PARTIAL
+                    entry.total_quantity -= trade_quantity
+                    dirty[side_key] = True
+                
+                matching_order.updated_at = now
         
-        return matching_orders
+        if trades:
+            self.next_trade_id = next_trade_id
+            order.updated_at = now
+            self.trades[symbol].extend(trades)
 
 
 # Global order book instance
@@ -1,11 +1,11 @@
-import json
+import orjson
 import time
 from typing import Dict, List, Optional, Tuple, Union, Any
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import redis
-from decimal import Decimal, ROUND_HALF_UP
 
 from app.core.redis_config import redis_config
 
@@ -28,51 +28,102 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+# Enum members by stored value; indexing these skips Enum.__call__ when
+# decoding stored orders
+_SIDE_MAP = {side.value: side for side in OrderSide}
+_ORDER_TYPE_MAP = {order_type.value: order_type for order_type in OrderType}
+_STATUS_MAP = {status.value: status for status in OrderStatus}
+
 class Order:
-    id: int
-    user_id: int
-    symbol: str
-    side: OrderSide
-    order_type: OrderType
-    quantity: float
-    filled_quantity: float = 0.0
-    price: Optional[float] = None
-    stop_price: Optional[float] = None
-    status: OrderStatus = OrderStatus.PENDING
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    """Order as stored, JSON encoded, in an ``order:{id}`` string.
+    
+    Slotted by hand, like the in-memory book's Order, since
+    ``@dataclass(slots=True)`` needs Python 3.10; one is built per order
+    read back from Redis.
+    """
+    
+    __slots__ = (
+        "id", "user_id", "symbol", "side", "order_type", "quantity",
+        "filled_quantity", "price", "stop_price", "status",
+        "created_at", "updated_at",
+    )
+    
+    def __init__(self, id: int, user_id: int, symbol: str, side: OrderSide,
+                 order_type: OrderType, quantity: float,
+                 filled_quantity: float = 0.0, price: Optional[float] = None,
+                 stop_price: Optional[float] = None,
+                 status: OrderStatus = OrderStatus.PENDING,
+                 created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None):
+        self.id = id
+        self.user_id = user_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.quantity = quantity
+        self.filled_quantity = filled_quantity
+        self.price = price
+        self.stop_price = stop_price
+        self.status = status
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or self.created_at
 
     def to_dict(self) -> dict:
         """Convert order to dictionary for Redis storage."""
-        data = asdict(self)
-        data['side'] = self.side.value
-        data['order_type'] = self.order_type.value
-        data['status'] = self.status.value
-        data['created_at'] = self.created_at.isoformat()
-        data['updated_at'] = self.updated_at.isoformat()
+        # A new order's timestamps are the same instant; format it once
+        created_at = self.created_at.isoformat()
+        updated_at = created_at if self.updated_at == self.created_at else self.updated_at.isoformat()
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'symbol': self.symbol,
+            'side': self.side.value,
+            'order_type': self.order_type.value,
+            'quantity': self.quantity,
+            'filled_quantity': self.filled_quantity,
+            'status': self.status.value,
+            'created_at': created_at,
+            'updated_at': updated_at
+        }
         
-        # Remove None values as Redis doesn't accept them
-        return {k: v for k, v in data.items() if v is not None}
+        # Leave out None values as Redis doesn't accept them
+        if self.price is not None:
+            data['price'] = self.price
+        if self.stop_price is not None:
+            data['stop_price'] = self.stop_price
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Order':
         """Create order from dictionary from Redis."""
+        # Numbers may come back as strings
+        data['id'] = int(data['id'])
+        data['user_id'] = int(data['user_id'])
+        data['quantity'] = float(data['quantity'])
+        data['filled_quantity'] = float(data.get('filled_quantity', 0.0))
+        
         # Handle missing optional fields
-        if 'price' not in data:
-            data['price'] = None
-        if 'stop_price' not in data:
-            data['stop_price'] = None
-        if 'filled_quantity' not in data:
-            data['filled_quantity'] = 0.0
+        data['price'] = float(data['price']) if 'price' in data else None
+        data['stop_price'] = float(data['stop_price']) if 'stop_price' in data else None
             
-        data['side'] = OrderSide(data['side'])
-        data['order_type'] = OrderType(data['order_type'])
-        data['status'] = OrderStatus(data['status'])
+        data['side'] = _SIDE_MAP[data['side']]
+        data['order_type'] = _ORDER_TYPE_MAP[data['order_type']]
+        data['status'] = _STATUS_MAP[data['status']]
         data['created_at'] = datetime.fromisoformat(data['created_at'])
         data['updated_at'] = datetime.fromisoformat(data['updated_at'])
         return cls(**data)
 
+    def to_json(self) -> bytes:
+        """Encode order for its Redis string key."""
+        return orjson.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, blob: Optional[bytes]) -> Optional['Order']:
+        """Decode an order read from Redis, or None if the key is missing."""
+        if blob is None:
+            return None
+        return cls.from_dict(orjson.loads(blob))
+
 
 @dataclass
 class Trade:
@@ -86,26 +137,253 @@ class Trade:
 
     def to_dict(self) -> dict:
         """Convert trade to dictionary for Redis storage."""
-        data = asdict(self)
-        data['executed_at'] = self.executed_at.isoformat()
-        return data
+        return {
+            'id': self.id,
+            'symbol': self.symbol,
+            'buy_order_id': self.buy_order_id,
+            'sell_order_id': self.sell_order_id,
+            'quantity': self.quantity,
+            'price': self.price,
+            'executed_at': self.executed_at.isoformat()
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Trade':
         """Create trade from dictionary from Redis."""
-        data['executed_at'] = datetime.fromisoformat(data['executed_at'])
+        # Stream fields come back as strings
+        data['id'] = int(data['id'])
+        data['buy_order_id'] = int(data['buy_order_id'])
+        data['sell_order_id'] = int(data['sell_order_id'])
+        data['quantity'] = float(data['quantity'])
+        data['price'] = float(data['price'])
+        executed_at = data['executed_at']
+        # Older Lua-matched trades carry epoch seconds instead of ISO time
+        if executed_at.isdigit():
+            data['executed_at'] = datetime.utcfromtimestamp(int(executed_at))
+        else:
+            data['executed_at'] = datetime.fromisoformat(executed_at)
         return cls(**data)
 
 
+@lru_cache(maxsize=1024)
+def _side_keys(symbol: str, side: OrderSide) -> Tuple[str, str, str]:
+    """Key prefix, quantity ZSET and count ZSET of one side of a symbol's book.
+    
+    There are only two per symbol, so they are built once rather than on
+    every order.
+    """
+    order_book_key = f"{symbol}:{'bids' if side == OrderSide.BUY else 'asks'}"
+    return order_book_key, f"{order_book_key}:qty", f"{order_book_key}:counts"
+
+
+# Price levels the pipelined matcher reads per round of lookups
+MATCH_LEVEL_BATCH = 16
+
+# Orders handled per round trip when clearing a symbol's book
+CLEAR_BATCH_SIZE = 500
+
+# Approximate number of trades kept in each trades:{symbol} stream
+TRADE_STREAM_MAXLEN = 10000
+
+# Consumer group of the matching workers reading incoming:{symbol} streams,
+# and how long one read blocks; kept below the socket timeout
+MATCHER_GROUP = "matchers"
+MATCHER_BLOCK_MS = 1000
+
+# Incoming-stream entries a matching worker takes per XREADGROUP
+MATCHER_READ_COUNT = 100
+
+# Atomic matching script, registered once per connection and run by SHA.
+# Used instead of the pipelined matcher when REDIS_LUA_MATCHING is set.
+_MATCH_LUA = """
+local order_id = ARGV[1]
+local symbol = ARGV[2]
+local side = ARGV[3]
+local quantity = tonumber(ARGV[4])
+local price_ticks = tonumber(ARGV[5])
+local order_type = ARGV[6]
+local trade_stream_maxlen = ARGV[7]
+-- Every fill of one match shares an execution time, ISO formatted like the
+-- pipelined matcher's
+local executed_at = ARGV[8]
+
+-- The incoming order itself; leave it alone if it was cancelled first
+local taker_key = 'order:' .. order_id
+local taker_json = redis.call('GET', taker_key)
+if not taker_json then
+    return {}
+end
+local taker_dict = cjson.decode(taker_json)
+if taker_dict['status'] ~= 'pending' then
+    return {}
+end
+
+local own_side = "bids"
+local opposite_side = "asks"
+if side == "sell" then
+    own_side = "asks"
+    opposite_side = "bids"
+end
+local order_book_key = symbol .. ":" .. opposite_side
+-- Per-level totals live in ZSETs parallel to the book, keyed by the same member
+local quantity_key = order_book_key .. ":qty"
+local count_key = order_book_key .. ":counts"
+
+local remaining_quantity = quantity
+local trades = {}
+
+-- Bids are scored by negated price, so ZRANGE is best-first for both sides
+local price_levels = redis.call('ZRANGE', order_book_key, 0, -1)
+
+for _, level_ticks in ipairs(price_levels) do
+    if remaining_quantity <= 0 then
+        break
+    end
+    
+    -- Check price condition for limit orders; members are integer ticks
+    if order_type == "limit" then
+        if side == "buy" and tonumber(level_ticks) > price_ticks then
+            break
+        elseif side == "sell" and tonumber(level_ticks) < price_ticks then
+            break
+        end
+    end
+    
+    local level_price = tostring(tonumber(level_ticks) / 100000000)
+    local price_key = symbol .. ":" .. opposite_side .. ":" .. level_ticks
+    local order_ids = redis.call('LRANGE', price_key, 0, -1)
+    local level_filled = 0
+    
+    for _, matching_order_id in ipairs(order_ids) do
+        if remaining_quantity <= 0 then
+            break
+        end
+        
+        -- Orders are stored as one JSON string per key
+        local order_key = 'order:' .. matching_order_id
+        local order_dict = cjson.decode(redis.call('GET', order_key))
+        
+        local order_status = order_dict['status']
+        if order_status == 'pending' or order_status == 'partial' then
+            local order_quantity = tonumber(order_dict['quantity'])
+            local filled_quantity = tonumber(order_dict['filled_quantity'])
+            local available_quantity = order_quantity - filled_quantity
+            
+            local trade_quantity = math.min(remaining_quantity, available_quantity)
+            
+            -- Create trade
+            local trade_id = redis.call('INCR', 'counters:trade_id')
+            local trade_data = {
+                id = trade_id,
+                symbol = symbol,
+                buy_order_id = side == "buy" and order_id or matching_order_id,
+                sell_order_id = side == "sell" and order_id or matching_order_id,
+                quantity = trade_quantity,
+                price = level_price,
+                executed_at = executed_at
+            }
+            
+            -- Add trade to stream, trimming old trades as it grows
+            redis.call('XADD', 'trades:' .. symbol, 'MAXLEN', '~', trade_stream_maxlen, '*',
+                      'id', trade_id,
+                      'symbol', symbol,
+                      'buy_order_id', trade_data.buy_order_id,
+                      'sell_order_id', trade_data.sell_order_id,
+                      'quantity', trade_quantity,
+                      'price', level_price,
+                      'executed_at', trade_data.executed_at)
+            
+            remaining_quantity = remaining_quantity - trade_quantity
+            
+            -- Update the resting order and its level
+            order_dict['filled_quantity'] = filled_quantity + trade_quantity
+            redis.call('ZINCRBY', quantity_key, -math.floor(trade_quantity * 100000000 + 0.5), level_ticks)
+            local new_status = 'partial'
+            if trade_quantity >= available_quantity then
+                new_status = 'filled'
+                redis.call('LREM', price_key, 0, matching_order_id)
+                redis.call('ZINCRBY', count_key, -1, level_ticks)
+                level_filled = level_filled + 1
+            end
+            order_dict['status'] = new_status
+            redis.call('SET', order_key, cjson.encode(order_dict))
+            
+            -- Move it between its user's per-status sets (scored by order id)
+            local user_orders_key = 'user:' .. order_dict['user_id'] .. ':orders:'
+            redis.call('ZREM', user_orders_key .. order_status, matching_order_id)
+            redis.call('ZADD', user_orders_key .. new_status, matching_order_id, matching_order_id)
+            
+            -- Strings, so fractional values survive the reply conversion
+            table.insert(trades, {
+                tostring(trade_id),
+                tostring(trade_data.buy_order_id),
+                tostring(trade_data.sell_order_id),
+                tostring(trade_quantity),
+                level_price,
+                executed_at
+            })
+        end
+    end
+    
+    -- Drop the level once every order queued on it has been filled
+    if level_filled > 0 and redis.call('LLEN', price_key) == 0 then
+        redis.call('DEL', price_key)
+        redis.call('ZREM', order_book_key, level_ticks)
+        redis.call('ZREM', quantity_key, level_ticks)
+        redis.call('ZREM', count_key, level_ticks)
+    end
+end
+
+-- Write the incoming order's new state and move it out of its user's pending set
+if #trades > 0 then
+    local taker_status = 'partial'
+    if remaining_quantity <= 0 then
+        taker_status = 'filled'
+    end
+    taker_dict['filled_quantity'] = quantity - remaining_quantity
+    taker_dict['status'] = taker_status
+    taker_dict['updated_at'] = executed_at
+    redis.call('SET', taker_key, cjson.encode(taker_dict))
+    
+    local user_orders_key = 'user:' .. taker_dict['user_id'] .. ':orders:'
+    redis.call('ZREM', user_orders_key .. 'pending', order_id)
+    redis.call('ZADD', user_orders_key .. taker_status, order_id, order_id)
+end
+
+-- Rest what is left of a limit order on its own side, in the same script so
+-- no other match can run against a crossed book
+local rests = order_type == "limit" and price_ticks > 0 and remaining_quantity > 0
+if rests then
+    local own_book_key = symbol .. ":" .. own_side
+    local member = ARGV[5]
+    local score = price_ticks
+    if side == "buy" then
+        score = -price_ticks
+    end
+    redis.call('RPUSH', own_book_key .. ":" .. member, order_id)
+    redis.call('ZADD', own_book_key, score, member)
+    redis.call('ZINCRBY', own_book_key .. ":qty", math.floor(remaining_quantity * 100000000 + 0.5), member)
+    redis.call('ZINCRBY', own_book_key .. ":counts", 1, member)
+end
+
+if #trades > 0 or rests then
+    redis.call('INCR', symbol .. ':version')
+end
+
+return {tostring(remaining_quantity), unpack(trades)}
+"""
+
+
 class RedisOrderBook:
     """
     Redis-based order book implementation using advanced Redis features.
     
     Data Structure:
     - Sorted Sets (ZSET) for price levels: symbol:bids, symbol:asks
-    - Lists for orders at each price level: symbol:bids:price, symbol:asks:price
-    - Hashes for order details: order:order_id
-    - Sets for user orders: user:user_id:orders
+    - Lists for orders at each price level: symbol:bids:ticks, symbol:asks:ticks
+    - Strings holding each order as JSON: order:order_id
+    - Sorted Sets for user orders, scored by order id: user:user_id:orders,
+      and one per status: user:user_id:orders:status
     - Streams for trade history: trades:symbol
     - Pub/Sub for real-time updates
     """
@@ -114,8 +392,10 @@ class RedisOrderBook:
         self.redis_url = redis_url
         self.db = db
         self.redis: Optional[redis.Redis] = None
-        self.pubsub: Optional[Any] = None  # redis.client.PubSub
         self._connected = False
+        self._match_script: Optional[Any] = None  # redis.commands.core.Script
+        self.lua_matching = redis_config.lua_matching
+        self.stream_matching = redis_config.stream_matching
         
         # Don't initialize counters here - do it lazily when first needed
     
@@ -123,21 +403,22 @@ class RedisOrderBook:
         """Ensure Redis connection is established."""
         if not self._connected:
             try:
+                # Replies stay bytes: ids and members go straight back into
+                # keys and commands, and orjson parses orders from bytes
                 if self.redis_url:
-                    self.redis = redis.from_url(self.redis_url, decode_responses=True)
+                    self.redis = redis.from_url(self.redis_url)
                 else:
                     # Use configuration
-                    kwargs = redis_config.get_connection_kwargs()
-                    if self.db is not None:
-                        kwargs["db"] = self.db
-                    self.redis = redis.Redis(**kwargs)
+                    self.redis = redis.Redis(connection_pool=redis_config.get_order_book_pool(self.db))
                 
-                self.pubsub = self.redis.pubsub()
                 self._connected = True
                 
                 # Initialize counters only after successful connection
                 self._init_counters()
                 
+                # Script objects send EVALSHA and reload on NOSCRIPT themselves
+                self._match_script = self.redis.register_script(_MATCH_LUA)
+                
             except Exception as e:
                 raise ConnectionError(f"Failed to connect to Redis: {e}")
     
@@ -159,25 +440,67 @@ class RedisOrderBook:
         result = self.redis.incr(counter_key)
         return int(result) if result is not None else 0
     
-    def _normalize_price(self, price: float) -> str:
-        """Normalize price to 8 decimal places for consistent ordering."""
-        return f"{Decimal(str(price)).quantize(Decimal('0.00000001'), rounding=ROUND_HALF_UP):.8f}"
+    def _price_to_ticks(self, price: float) -> int:
+        """Convert a price to integer ticks of 1e-8, as used in keys and ZSETs."""
+        return int(round(price * 100000000))
     
-    def _get_price_key(self, symbol: str, side: OrderSide, price: float) -> str:
-        """Get Redis key for price level."""
-        side_str = "bids" if side == OrderSide.BUY else "asks"
-        normalized_price = self._normalize_price(price)
-        return f"{symbol}:{side_str}:{normalized_price}"
+    def _ticks_to_price(self, ticks: int) -> float:
+        """Convert integer ticks back to a price."""
+        return ticks / 100000000
+    
+    def _get_price_key(self, symbol: str, side: OrderSide, ticks: int) -> str:
+        """Get Redis key for the price level at ``ticks``."""
+        return f"{_side_keys(symbol, side)[0]}:{ticks}"
     
     def _get_order_book_key(self, symbol: str, side: OrderSide) -> str:
         """Get Redis key for order book sorted set."""
-        side_str = "bids" if side == OrderSide.BUY else "asks"
-        return f"{symbol}:{side_str}"
+        return _side_keys(symbol, side)[0]
+    
+    def _get_level_totals_keys(self, symbol: str, side: OrderSide) -> Tuple[str, str]:
+        """Get Redis keys of the ZSETs holding each price level's totals.
+        
+        Members are the order book's price members; scores are the level's
+        remaining quantity (in 1e-8 units) and its order count.
+        """
+        _, quantity_key, count_key = _side_keys(symbol, side)
+        return quantity_key, count_key
+    
+    def _get_version_key(self, symbol: str) -> str:
+        """Get Redis key bumped by every write to a symbol's book.
+        
+        The pipelined matcher WATCHes it so that its reads and its MULTI of
+        writes apply to the same book state.
+        """
+        return f"{symbol}:version"
+    
+    def _get_user_orders_key(self, user_id: int, status: Optional[OrderStatus] = None) -> str:
+        """Get Redis key of a user's orders, or of those with ``status``.
+        
+        Members and scores are order ids, which are issued in creation
+        order, so a reverse range lists the newest orders first.
+        """
+        if status is None:
+            return f"user:{user_id}:orders"
+        return f"user:{user_id}:orders:{status.value}"
+    
+    def _move_user_order_pipeline(self, pipe, user_id: int, order_id: int,
+                                  old_status: OrderStatus, new_status: OrderStatus):
+        """Queue moving an order between its user's per-status sets."""
+        pipe.zrem(self._get_user_orders_key(user_id, old_status), order_id)
+        pipe.zadd(self._get_user_orders_key(user_id, new_status), {order_id: order_id})
+    
+    def _get_incoming_key(self, symbol: str) -> str:
+        """Get Redis stream key feeding new orders to the symbol's matcher."""
+        return f"incoming:{symbol}"
     
     def add_order(self, user_id: int, symbol: str, side: OrderSide, 
                   order_type: OrderType, quantity: float, 
                   price: Optional[float] = None, stop_price: Optional[float] = None) -> Order:
-        """Add a new order to the order book using Redis pipeline for atomicity."""
+        """Add a new order to the order book using Redis pipeline for atomicity.
+        
+        With stream matching the order is queued for the symbol's matcher
+        (see ``run_matcher``) and returned still pending.
+        """
         
         self._ensure_connection()
         if self.redis is None:
@@ -201,186 +524,297 @@ class RedisOrderBook:
         
         try:
             # Store order details
-            pipe.hset(f"order:{order_id}", mapping=order.to_dict())
+            pipe.set(f"order:{order_id}", order.to_json())
             
-            # Add to user's orders set
-            pipe.sadd(f"user:{user_id}:orders", order_id)
+            # Add to user's orders and pending orders
+            pipe.zadd(self._get_user_orders_key(user_id), {order_id: order_id})
+            pipe.zadd(self._get_user_orders_key(user_id, order.status), {order_id: order_id})
             
             # Add to symbol orders set
             pipe.sadd(f"symbol:{symbol}:orders", order_id)
             
-            # If it's a limit order, add to order book
-            if order_type == OrderType.LIMIT and price is not None:
-                self._add_to_order_book_pipeline(pipe, order)
+            # Hand the order to the symbol's matcher
+            if self.stream_matching:
+                pipe.xadd(self._get_incoming_key(symbol), {"order_id": order_id})
             
             # Execute all operations atomically
             pipe.execute()
             
-            # Try to match the order
-            self._match_order(order)
-            
-            # Publish order update
-            self._publish_order_update(order)
-            
-            return order
+            if self.stream_matching:
+                return order
+            return self._match_and_rest(order)
             
         except Exception as e:
             # Rollback on error
             if self.redis is not None:
                 self.redis.delete(f"order:{order_id}")
-                self.redis.srem(f"user:{user_id}:orders", order_id)
+                self.redis.zrem(self._get_user_orders_key(user_id), order_id)
+                self.redis.zrem(self._get_user_orders_key(user_id, OrderStatus.PENDING), order_id)
                 self.redis.srem(f"symbol:{symbol}:orders", order_id)
             raise e
     
+    def _match_and_rest(self, order: Order, reload: bool = False) -> Order:
+        """Match an order, then rest what is left of a limit order on the
+        book, write its new state and publish the update.
+        
+        ``reload`` makes the pipelined matcher re-read the order once it is
+        WATCHed, so an order cancelled in the meantime is left alone.
+        """
+        if self.lua_matching:
+            # The script rests the remainder and stores the order itself;
+            # only the pub/sub messages are left to send
+            pipe = self.redis.pipeline(transaction=False)
+            if self._match_order(order, pipe):
+                self._publish_order_update(order, pipe)
+            pipe.execute()
+            return order
+        return self._match_order_pipelined(order, reload)
+    
+    def run_matcher(self, symbol: str, consumer: str = "matcher"):
+        """Match a symbol's queued orders one at a time, forever.
+        
+        Reads ``incoming:{symbol}`` through the MATCHER_GROUP consumer group,
+        starting with any entries a previous run read but never acknowledged,
+        and acknowledges and trims each entry once its order is matched. Run
+        a single consumer per symbol so that matching stays in arrival order.
+        """
+        self._ensure_connection()
+        if self.redis is None:
+            raise ConnectionError("Redis connection not established")
+        
+        stream_key = self._get_incoming_key(symbol)
+        try:
+            self.redis.xgroup_create(stream_key, MATCHER_GROUP, id="0", mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        
+        # "0" replays this consumer's pending entries; ">" waits for new ones
+        last_id = "0"
+        while True:
+            response = self.redis.xreadgroup(MATCHER_GROUP, consumer, {stream_key: last_id},
+                                             count=MATCHER_READ_COUNT, block=MATCHER_BLOCK_MS)
+            entries = response[0][1] if response else []
+            if last_id == "0" and not entries:
+                last_id = ">"
+                continue
+            
+            for entry_id, fields in entries:
+                order = Order.from_json(self.redis.get(b"order:" + fields[b"order_id"]))
+                if order is not None and order.status == OrderStatus.PENDING:
+                    self._match_and_rest(order, reload=True)
+                
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.xack(stream_key, MATCHER_GROUP, entry_id)
+                pipe.xdel(stream_key, entry_id)
+                pipe.execute()
+    
+    def _finish_order_pipeline(self, pipe, order: Order):
+        """Queue the post-match writes for an incoming order on ``pipe``."""
+        if (order.order_type == OrderType.LIMIT and order.price is not None
+                and order.status != OrderStatus.FILLED):
+            self._add_to_order_book_pipeline(pipe, order)
+        pipe.set(f"order:{order.id}", order.to_json())
+        if order.status != OrderStatus.PENDING:
+            self._move_user_order_pipeline(pipe, order.user_id, order.id,
+                                           OrderStatus.PENDING, order.status)
+        self._publish_order_update(order, pipe)
+    
     def _add_to_order_book_pipeline(self, pipe, order: Order):
         """Add order to order book using pipeline."""
         if order.price is None:
             return
             
-        price_key = self._get_price_key(order.symbol, order.side, order.price)
+        ticks = self._price_to_ticks(order.price)
+        price_key = self._get_price_key(order.symbol, order.side, ticks)
         order_book_key = self._get_order_book_key(order.symbol, order.side)
         
-        # Add order to price level list (FIFO)
-        pipe.lpush(price_key, order.id)
+        # Add order to the tail of the price level list (FIFO)
+        pipe.rpush(price_key, order.id)
         
-        # Add price to sorted set
-        # For bids: use negative price for descending order (highest first)
-        # For asks: use positive price for ascending order (lowest first)
-        score = -order.price if order.side == OrderSide.BUY else order.price
-        pipe.zadd(order_book_key, {str(order.price): score})
+        # Add price ticks to sorted set
+        # For bids: use negative ticks for descending order (highest first)
+        # For asks: use positive ticks for ascending order (lowest first)
+        member = str(ticks)
+        score = -ticks if order.side == OrderSide.BUY else ticks
+        pipe.zadd(order_book_key, {member: score})
         
-        # Update price level metadata
-        pipe.hincrby(f"{price_key}:meta", "total_quantity", int(order.quantity * 100000000))  # Store as integer
-        pipe.hincrby(f"{price_key}:meta", "order_count", 1)
+        # Update price level totals with the quantity left to fill
+        quantity_key, count_key = self._get_level_totals_keys(order.symbol, order.side)
+        remaining_quantity = order.quantity - order.filled_quantity
+        pipe.zincrby(quantity_key, int(round(remaining_quantity * 100000000)), member)  # Store as integer
+        pipe.zincrby(count_key, 1, member)
+        pipe.incr(self._get_version_key(order.symbol))
     
     def cancel_order(self, order_id: int, user_id: int) -> Order:
-        """Cancel an order."""
+        """Cancel an order.
+        
+        The order and its price level are read while WATCHed, and every write
+        of the cancellation goes out in one MULTI; a concurrent fill or book
+        change aborts EXEC and the cancel is retried from fresh reads.
+        """
         self._ensure_connection()
         if self.redis is None:
             raise ConnectionError("Redis connection not established")
         
-        # Get order details
-        order_data = self.redis.hgetall(f"order:{order_id}")
-        if not order_data:
-            raise ValueError("Order not found")
-        
-        order = Order.from_dict(order_data)
-        
-        if order.user_id != user_id:
-            raise ValueError("Order does not belong to user")
-        
-        if order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED]:
-            raise ValueError(f"Cannot cancel order with status: {order.status}")
-        
-        # Update order status
-        order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
-        
-        pipe = self.redis.pipeline(transaction=True)
-        
-        # Update order in Redis
-        pipe.hset(f"order:{order_id}", mapping=order.to_dict())
-        
-        # Remove from order book if it was a limit order
-        if order.order_type == OrderType.LIMIT and order.price is not None:
-            self._remove_from_order_book_pipeline(pipe, order)
-        
-        pipe.execute()
-        
-        # Publish order update
-        self._publish_order_update(order)
-        
-        return order
+        order_key = f"order:{order_id}"
+        with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # Get order details
+                    pipe.watch(order_key)
+                    order = Order.from_json(pipe.get(order_key))
+                    if order is None:
+                        raise ValueError("Order not found")
+                    
+                    if order.user_id != user_id:
+                        raise ValueError("Order does not belong to user")
+                    
+                    if order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED]:
+                        raise ValueError(f"Cannot cancel order with status: {order.status}")
+                    
+                    # Check whether the order rests on the book (it may not
+                    # have been matched yet) and whether it is its level's last
+                    level_count = 0
+                    if order.order_type == OrderType.LIMIT and order.price is not None:
+                        pipe.watch(self._get_version_key(order.symbol))
+                        level_count = self._resting_level_count(order)
+                    on_book = level_count > 0
+                    level_emptied = level_count <= 1
+                    
+                    # Update order status
+                    previous_status = order.status
+                    order.status = OrderStatus.CANCELLED
+                    order.updated_at = datetime.utcnow()
+                    
+                    pipe.multi()
+                    
+                    # Update order in Redis
+                    pipe.set(order_key, order.to_json())
+                    self._move_user_order_pipeline(pipe, user_id, order.id,
+                                                   previous_status, order.status)
+                    
+                    # Remove from order book if it was a limit order
+                    if on_book:
+                        self._remove_from_order_book_pipeline(pipe, order, level_emptied)
+                    
+                    # Publish order update along with the cancellation
+                    self._publish_order_update(order, pipe)
+                    
+                    pipe.execute()
+                    return order
+                except redis.exceptions.WatchError:
+                    continue
     
-    def _remove_from_order_book_pipeline(self, pipe, order: Order):
-        """Remove order from order book using pipeline."""
-        price_key = self._get_price_key(order.symbol, order.side, order.price)
-        order_book_key = self._get_order_book_key(order.symbol, order.side)
-        
-        # Remove order from price level list
-        pipe.lrem(price_key, 0, order.id)
-        
-        # Update price level metadata
-        pipe.hincrby(f"{price_key}:meta", "total_quantity", -int(order.quantity * 100000000))
-        pipe.hincrby(f"{price_key}:meta", "order_count", -1)
+    def _resting_level_count(self, order: Order) -> int:
+        """Read the number of orders at ``order``'s price level, or 0 if
+        ``order`` is not queued there."""
+        ticks = self._price_to_ticks(order.price)
+        _, count_key = self._get_level_totals_keys(order.symbol, order.side)
         
-        # Check if price level is empty
-        pipe.llen(price_key)
-        pipe.hget(f"{price_key}:meta", "order_count")
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.lpos(self._get_price_key(order.symbol, order.side, ticks), order.id)
+        pipe.zscore(count_key, str(ticks))
+        position, count = pipe.execute()
+        return int(count or 0) if position is not None else 0
+    
+    def _remove_from_order_book_pipeline(self, pipe, order: Order, level_emptied: bool):
+        """Queue the removal of ``order`` from the order book on ``pipe``.
         
-        # Execute to get results
-        results = pipe.execute()
-        order_count = results[-1]
+        ``level_emptied`` says whether it is the last order at its price, in
+        which case the whole level is dropped.
+        """
+        ticks = self._price_to_ticks(order.price)
+        price_key = self._get_price_key(order.symbol, order.side, ticks)
+        order_book_key = self._get_order_book_key(order.symbol, order.side)
+        member = str(ticks)
+        quantity_key, count_key = self._get_level_totals_keys(order.symbol, order.side)
         
-        if order_count == "0" or order_count == 0:
+        if level_emptied:
             # Remove empty price level
-            pipe.delete(price_key, f"{price_key}:meta")
-            pipe.zrem(order_book_key, str(order.price))
+            pipe.delete(price_key)
+            pipe.zrem(order_book_key, member)
+            pipe.zrem(quantity_key, member)
+            pipe.zrem(count_key, member)
+        else:
+            # Remove order from price level list and update the level totals
+            pipe.lrem(price_key, 0, order.id)
+            remaining_quantity = order.quantity - order.filled_quantity
+            pipe.zincrby(quantity_key, -int(round(remaining_quantity * 100000000)), member)
+            pipe.zincrby(count_key, -1, member)
+        pipe.incr(self._get_version_key(order.symbol))
     
     def get_order(self, order_id: int, user_id: int) -> Order:
         """Get a specific order."""
         self._ensure_connection()
         
-        order_data = self.redis.hgetall(f"order:{order_id}")
-        if not order_data:
+        order = Order.from_json(self.redis.get(f"order:{order_id}"))
+        if order is None:
             raise ValueError("Order not found")
         
-        order = Order.from_dict(order_data)
         if order.user_id != user_id:
             raise ValueError("Order does not belong to user")
         
         return order
     
     def get_user_orders(self, user_id: int, status: Optional[OrderStatus] = None) -> List[Order]:
-        """Get orders for a specific user."""
+        """Get orders for a specific user, newest first."""
         self._ensure_connection()
         
-        order_ids = self.redis.smembers(f"user:{user_id}:orders")
-        orders = []
+        # Status filtering and ordering both happen in Redis
+        order_ids = self.redis.zrevrange(self._get_user_orders_key(user_id, status), 0, -1)
         
-        for order_id in order_ids:
-            order_data = self.redis.hgetall(f"order:{order_id}")
-            if order_data:
-                order = Order.from_dict(order_data)
-                if status is None or order.status == status:
-                    orders.append(order)
+        if not order_ids:
+            return []
         
-        return sorted(orders, key=lambda x: x.created_at, reverse=True)
+        # Fetch all orders with one MGET
+        orders = [Order.from_json(blob) for blob in
+                  self.redis.mget([b"order:" + order_id for order_id in order_ids])]
+        return [order for order in orders if order is not None]
+    
+    def get_user_order_status_counts(self, user_id: int) -> Dict[OrderStatus, int]:
+        """Count a user's orders by status from the sizes of the per-status sets."""
+        self._ensure_connection()
+        
+        pipe = self.redis.pipeline(transaction=False)
+        for order_status in OrderStatus:
+            pipe.zcard(self._get_user_orders_key(user_id, order_status))
+        
+        return dict(zip(OrderStatus, pipe.execute()))
     
     def get_order_book(self, symbol: str, depth: int = 10) -> Dict:
         """Get the order book for a specific symbol."""
         self._ensure_connection()
         
-        bids = []
-        asks = []
+        # Bids are scored by negated price, so ZRANGE yields the highest bid
+        # first; asks ascend by price. Both sides come back in one round trip.
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrange(f"{symbol}:bids", 0, depth - 1)
+        pipe.zrange(f"{symbol}:asks", 0, depth - 1)
+        bid_prices, ask_prices = pipe.execute()
         
-        # Get bids (buy orders) - descending by price
-        bid_prices = self.redis.zrevrange(f"{symbol}:bids", 0, depth - 1, withscores=True)
-        for price_str, _ in bid_prices:
-            price = float(price_str)
-            price_key = self._get_price_key(symbol, OrderSide.BUY, price)
-            meta = self.redis.hgetall(f"{price_key}:meta")
-            
-            if meta:
-                bids.append({
-                    "price": price,
-                    "total_quantity": float(meta.get("total_quantity", 0)) / 100000000,
-                    "order_count": int(meta.get("order_count", 0))
-                })
-        
-        # Get asks (sell orders) - ascending by price
-        ask_prices = self.redis.zrange(f"{symbol}:asks", 0, depth - 1, withscores=True)
-        for price_str, _ in ask_prices:
-            price = float(price_str)
-            price_key = self._get_price_key(symbol, OrderSide.SELL, price)
-            meta = self.redis.hgetall(f"{price_key}:meta")
-            
-            if meta:
-                asks.append({
-                    "price": price,
-                    "total_quantity": float(meta.get("total_quantity", 0)) / 100000000,
-                    "order_count": int(meta.get("order_count", 0))
-                })
+        # Then both sides' level totals in a second one, two ZMSCOREs a side
+        sides = [(OrderSide.BUY, bid_prices), (OrderSide.SELL, ask_prices)]
+        for side, prices in sides:
+            if prices:
+                quantity_key, count_key = self._get_level_totals_keys(symbol, side)
+                pipe.zmscore(quantity_key, prices)
+                pipe.zmscore(count_key, prices)
+        totals = iter(pipe.execute())
+        
+        levels = {OrderSide.BUY: [], OrderSide.SELL: []}
+        for side, prices in sides:
+            if not prices:
+                continue
+            for price_str, quantity, count in zip(prices, next(totals), next(totals)):
+                if quantity is not None:
+                    levels[side].append({
+                        "price": self._ticks_to_price(int(price_str)),
+                        "total_quantity": quantity / 100000000,
+                        "order_count": int(count or 0)
+                    })
+        bids = levels[OrderSide.BUY]
+        asks = levels[OrderSide.SELL]
         
         return {
             "symbol": symbol,
@@ -408,144 +842,223 @@ class RedisOrderBook:
         
         return trades
     
-    def _match_order(self, order: Order):
-        """Match an order against the order book using Lua script for atomicity."""
+    def _match_order(self, order: Order, pipe) -> bool:
+        """Match an order against the order book using Lua script for atomicity.
+        
+        The script also stores the order's new state and rests a limit
+        order's remainder. A single trade_updates message carrying every
+        fill of the match is queued on ``pipe`` rather than sent here.
+        Returns False if the stored order was no longer pending.
+        """
         if order.status != OrderStatus.PENDING:
-            return
+            return False
         
-        # Lua script for atomic order matching
-        lua_script = """
-        local order_id = ARGV[1]
-        local symbol = ARGV[2]
-        local side = ARGV[3]
-        local quantity = tonumber(ARGV[4])
-        local price = tonumber(ARGV[5])
-        local order_type = ARGV[6]
-        
-        local opposite_side = "asks"
-        local order_book_key = symbol .. ":" .. opposite_side
-        
-        if side == "sell" then
-            opposite_side = "bids"
-            order_book_key = symbol .. ":" .. opposite_side
-        end
+        # Execute Lua script
+        now = datetime.utcnow()
+        executed_at = now.isoformat()
+        result = self._match_script(keys=[], args=[
+            order.id, order.symbol, order.side.value,
+            order.quantity, self._price_to_ticks(order.price or 0), order.order_type.value,
+            TRADE_STREAM_MAXLEN, executed_at
+        ])
         
-        local remaining_quantity = quantity
-        local trades = {}
-        
-        -- Get matching price levels
-        local price_levels
-        if side == "buy" then
-            -- For buy orders, get asks in ascending order (lowest first)
-            price_levels = redis.call('ZRANGE', order_book_key, 0, -1, 'WITHSCORES')
-        else
-            -- For sell orders, get bids in descending order (highest first)
-            price_levels = redis.call('ZREVRANGE', order_book_key, 0, -1, 'WITHSCORES')
-        end
+        if not result:
+            return False
+        
+        # Mirror the stored order's new state (an unmatched order stays pending)
+        remaining_quantity = float(result[0])
+        if remaining_quantity < order.quantity:
+            order.filled_quantity = order.quantity - remaining_quantity
+            order.status = OrderStatus.FILLED if remaining_quantity <= 0 else OrderStatus.PARTIAL
+            order.updated_at = now
+        
+        # Publish all fills of this match together rather than one per fill
+        trades = [
+            {
+                "id": int(trade_id),
+                "symbol": order.symbol,
+                "buy_order_id": int(buy_order_id),
+                "sell_order_id": int(sell_order_id),
+                "quantity": float(quantity),
+                "price": float(price),
+                "executed_at": executed_at
+            }
+            for trade_id, buy_order_id, sell_order_id, quantity, price, _ in result[1:]
+        ]
+        if trades:
+            pipe.publish(f"trade_updates:{order.symbol}", orjson.dumps(trades))
+        return True
+    
+    def _match_order_pipelined(self, order: Order, reload: bool = False) -> Order:
+        """Match, rest and publish an incoming order without server-side Lua.
+        
+        Resting orders are read in batched pipelines while the order and the
+        symbol's version key are WATCHed; the fills, level updates, the
+        order's new state and its updates then go out in one MULTI. If
+        another writer touches either in between, EXEC aborts and the match
+        is replanned from the stored order. Returns the order as stored.
+        """
+        order_key = f"order:{order.id}"
+        version_key = self._get_version_key(order.symbol)
+        with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(order_key, version_key)
+                    if reload:
+                        # Leave the order alone if it was cancelled first
+                        order = Order.from_json(pipe.get(order_key))
+                        if order is None or order.status != OrderStatus.PENDING:
+                            return order
+                    fills, cleared_levels = self._plan_fills(order)
+                    pipe.multi()
+                    self._apply_fills_pipeline(pipe, order, fills, cleared_levels)
+                    self._finish_order_pipeline(pipe, order)
+                    pipe.execute()
+                    return order
+                except redis.exceptions.WatchError:
+                    # The plan is stale; start over from the current state
+                    reload = True
+    
+    def _plan_fills(self, order: Order) -> Tuple[List[tuple], List[Tuple[str, str]]]:
+        """Work out the fills for ``order`` against the current book.
+        
+        Reads up to MATCH_LEVEL_BATCH crossing levels per round: one ZRANGE,
+        one pipeline of LRANGEs for their queues and one MGET of the queued
+        orders. Sets the order's filled quantity and status and returns
+        ``(fills, cleared_levels)``, where each fill is ``(maker, maker_status,
+        price_key, member, price, quantity, maker_done)`` with ``maker``'s
+        filled quantity already advanced, and each cleared level is
+        ``(price_key, zset_member)``.
+        """
+        is_buy = order.side == OrderSide.BUY
+        opposite_side = OrderSide.SELL if is_buy else OrderSide.BUY
+        order_book_key = self._get_order_book_key(order.symbol, opposite_side)
+        limit_ticks = (self._price_to_ticks(order.price)
+                       if order.order_type == OrderType.LIMIT and order.price is not None else None)
         
-        for i = 1, #price_levels, 2 do
-            local level_price = price_levels[i]
-            local score = price_levels[i + 1]
+        remaining_quantity = order.quantity
+        fills = []
+        cleared_levels = []
+        reader = self.redis.pipeline(transaction=False)
+        start = 0
+        
+        while remaining_quantity > 0:
+            # Bids are scored by negated price, so ZRANGE is best-first for both sides
+            members = self.redis.zrange(order_book_key, start, start + MATCH_LEVEL_BATCH - 1)
             
-            -- Check price condition for limit orders
-            if order_type == "limit" then
-                if side == "buy" and tonumber(level_price) > price then
-                    break
-                elseif side == "sell" and tonumber(level_price) < price then
-                    break
-                end
-            end
+            # Keep the levels the order crosses
+            levels = []
+            for member in members:
+                level_ticks = int(member)
+                if limit_ticks is not None:
+                    if is_buy and level_ticks > limit_ticks:
+                        break
+                    if not is_buy and level_ticks < limit_ticks:
+                        break
+                price_key = self._get_price_key(order.symbol, opposite_side, level_ticks)
+                levels.append((member, self._ticks_to_price(level_ticks), price_key))
+            if not levels:
+                break
             
-            local price_key = symbol .. ":" .. opposite_side .. ":" .. level_price
-            local order_ids = redis.call('LRANGE', price_key, 0, -1)
+            for _, _, price_key in levels:
+                reader.lrange(price_key, 0, -1)
+            queues = reader.execute()
+            maker_keys = [b"order:" + maker_id for queue in queues for maker_id in queue]
+            makers = iter(self.redis.mget(maker_keys) if maker_keys else [])
             
-            for _, matching_order_id in ipairs(order_ids) do
-                if remaining_quantity <= 0 then
-                    break
-                end
-                
-                local order_data = redis.call('HGETALL', 'order:' .. matching_order_id)
-                local order_dict = {}
-                for j = 1, #order_data, 2 do
-                    order_dict[order_data[j]] = order_data[j + 1]
-                end
-                
-                local order_status = order_dict['status']
-                if order_status == 'pending' or order_status == 'partial' then
-                    local order_quantity = tonumber(order_dict['quantity'])
-                    local filled_quantity = tonumber(order_dict['filled_quantity'])
-                    local available_quantity = order_quantity - filled_quantity
-                    
-                    local trade_quantity = math.min(remaining_quantity, available_quantity)
-                    
-                    -- Create trade
-                    local trade_id = redis.call('INCR', 'counters:trade_id')
-                    local trade_data = {
-                        id = trade_id,
-                        symbol = symbol,
-                        buy_order_id = side == "buy" and order_id or matching_order_id,
-                        sell_order_id = side == "sell" and order_id or matching_order_id,
-                        quantity = trade_quantity,
-                        price = level_price,
-                        executed_at = redis.call('TIME')[1]
-                    }
+            for (member, level_price, price_key), queue in zip(levels, queues):
+                level_cleared = True
+                for _ in queue:
+                    maker = Order.from_json(next(makers))
+                    if maker is None or maker.status not in (OrderStatus.PENDING, OrderStatus.PARTIAL):
+                        continue
+                    if remaining_quantity <= 0:
+                        level_cleared = False
+                        continue
                     
-                    -- Add trade to stream
-                    redis.call('XADD', 'trades:' .. symbol, '*', 
-                              'id', trade_id,
-                              'symbol', symbol,
-                              'buy_order_id', trade_data.buy_order_id,
-                              'sell_order_id', trade_data.sell_order_id,
-                              'quantity', trade_quantity,
-                              'price', level_price,
-                              'executed_at', trade_data.executed_at)
+                    available_quantity = maker.quantity - maker.filled_quantity
+                    trade_quantity = min(remaining_quantity, available_quantity)
+                    maker_done = trade_quantity >= available_quantity
+                    if not maker_done:
+                        level_cleared = False
                     
-                    -- Update order quantities
-                    redis.call('HINCRBY', 'order:' .. order_id, 'filled_quantity', trade_quantity)
-                    redis.call('HINCRBY', 'order:' .. matching_order_id, 'filled_quantity', trade_quantity)
-                    
-                    remaining_quantity = remaining_quantity - trade_quantity
-                    
-                    -- Update order statuses
-                    local new_filled = tonumber(redis.call('HGET', 'order:' .. order_id, 'filled_quantity'))
-                    local order_qty = tonumber(redis.call('HGET', 'order:' .. order_id, 'quantity'))
-                    if new_filled >= order_qty then
-                        redis.call('HSET', 'order:' .. order_id, 'status', 'filled')
-                    else
-                        redis.call('HSET', 'order:' .. order_id, 'status', 'partial')
-                    end
-                    
-                    local matching_filled = tonumber(redis.call('HGET', 'order:' .. matching_order_id, 'filled_quantity'))
-                    local matching_qty = tonumber(redis.call('HGET', 'order:' .. matching_order_id, 'quantity'))
-                    if matching_filled >= matching_qty then
-                        redis.call('HSET', 'order:' .. matching_order_id, 'status', 'filled')
-                        -- Remove filled order from order book
-                        redis.call('LREM', price_key, 0, matching_order_id)
-                    else
-                        redis.call('HSET', 'order:' .. matching_order_id, 'status', 'partial')
-                    end
-                    
-                    table.insert(trades, trade_id)
-                end
-            end
-        end
+                    remaining_quantity -= trade_quantity
+                    maker.filled_quantity += trade_quantity
+                    fills.append((maker, maker.status, price_key, member, level_price,
+                                  trade_quantity, maker_done))
+                
+                if level_cleared:
+                    cleared_levels.append((price_key, member))
+            
+            # Stop at a level that doesn't cross or at the end of the book
+            if len(levels) < MATCH_LEVEL_BATCH:
+                break
+            start += MATCH_LEVEL_BATCH
         
-        return {remaining_quantity, unpack(trades)}
-        """
+        if fills:
+            order.filled_quantity = order.quantity - remaining_quantity
+            order.status = OrderStatus.FILLED if remaining_quantity <= 0 else OrderStatus.PARTIAL
         
-        # Execute Lua script
-        result = self.redis.eval(lua_script, 0, 
-                                order.id, order.symbol, order.side.value, 
-                                order.quantity, order.price or 0, order.order_type.value)
-        
-        # Update order with remaining quantity
-        if result[0] > 0:
-            order.filled_quantity = order.quantity - result[0]
-            order.status = OrderStatus.PARTIAL if order.filled_quantity > 0 else OrderStatus.FILLED
-            self.redis.hset(f"order:{order.id}", mapping=order.to_dict())
-    
-    def _publish_order_update(self, order: Order):
-        """Publish order update to Redis pub/sub."""
+        return fills, cleared_levels
+    
+    def _apply_fills_pipeline(self, pipe, order: Order, fills: List[tuple],
+                              cleared_levels: List[Tuple[str, str]]):
+        """Queue the writes for planned fills on ``pipe``."""
+        if not fills:
+            return
+        
+        is_buy = order.side == OrderSide.BUY
+        opposite_side = OrderSide.SELL if is_buy else OrderSide.BUY
+        quantity_key, count_key = self._get_level_totals_keys(order.symbol, opposite_side)
+        now = datetime.utcnow()
+        executed_at = now.isoformat()
+        order.updated_at = now
+        
+        # Reserve the trade ids up front; a replanned match leaves a gap
+        trade_id = self.redis.incrby("counters:trade_id", len(fills)) - len(fills)
+        
+        trades = []
+        for maker, maker_status, price_key, member, price, quantity, maker_done in fills:
+            trade_id += 1
+            maker_id = maker.id
+            trade = {
+                "id": trade_id,
+                "symbol": order.symbol,
+                "buy_order_id": order.id if is_buy else maker_id,
+                "sell_order_id": maker_id if is_buy else order.id,
+                "quantity": quantity,
+                "price": price,
+                "executed_at": executed_at
+            }
+            pipe.xadd(f"trades:{order.symbol}", trade,
+                      maxlen=TRADE_STREAM_MAXLEN, approximate=True)
+            trades.append(trade)
+            
+            maker.status = OrderStatus.FILLED if maker_done else OrderStatus.PARTIAL
+            maker.updated_at = now
+            pipe.set(f"order:{maker_id}", maker.to_json())
+            self._move_user_order_pipeline(pipe, maker.user_id, maker_id,
+                                           maker_status, maker.status)
+            pipe.zincrby(quantity_key, -int(round(quantity * 100000000)), member)
+            if maker_done:
+                pipe.lrem(price_key, 0, maker_id)
+                pipe.zincrby(count_key, -1, member)
+        
+        # Drop levels whose every order was filled
+        order_book_key = self._get_order_book_key(order.symbol, opposite_side)
+        for price_key, member in cleared_levels:
+            pipe.delete(price_key)
+            pipe.zrem(order_book_key, member)
+            pipe.zrem(quantity_key, member)
+            pipe.zrem(count_key, member)
+        
+        pipe.incr(self._get_version_key(order.symbol))
+        
+        # Publish all fills of this match together rather than one per fill
+        pipe.publish(f"trade_updates:{order.symbol}", orjson.dumps(trades))
+    
+    def _publish_order_update(self, order: Order, pipe=None):
+        """Publish order update to Redis pub/sub, or queue it on ``pipe``."""
         update_data = {
             "order_id": order.id,
             "symbol": order.symbol,
@@ -554,58 +1067,77 @@ class RedisOrderBook:
             "quantity": order.quantity,
             "filled_quantity": order.filled_quantity,
             "price": order.price,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": order.updated_at
         }
         
-        self.redis.publish(f"order_updates:{order.symbol}", json.dumps(update_data))
+        # The order's own last change, which orjson writes in the same ISO
+        # form as isoformat()
+        (pipe or self.redis).publish(f"order_updates:{order.symbol}", orjson.dumps(update_data))
     
-    def subscribe_to_updates(self, symbol: str, callback):
-        """Subscribe to real-time order book updates."""
-        self._ensure_connection()
-        self.pubsub.subscribe(f"order_updates:{symbol}")
+    async def subscribe_to_updates(self, symbol: str, callback):
+        """Subscribe to real-time order book updates.
         
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                data = json.loads(message['data'])
-                callback(data)
+        Listens on the shared asyncio pool, so subscriptions are tasks on
+        the event loop rather than one blocked thread each; run it with
+        ``asyncio.create_task``.
+        """
+        async with redis_config.get_client().pubsub() as pubsub:
+            await pubsub.subscribe(f"order_updates:{symbol}")
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    callback(orjson.loads(message['data']))
     
     def get_order_book_snapshot(self, symbol: str) -> Dict:
         """Get a complete snapshot of the order book."""
         return self.get_order_book(symbol, depth=1000)
     
     def clear_order_book(self, symbol: str):
-        """Clear all orders for a symbol (for testing)."""
+        """Clear all orders for a symbol (for testing).
+        
+        Walks the symbol's orders with SSCAN and clears them CLEAR_BATCH_SIZE
+        at a time, so neither the client nor Redis handles them all at once.
+        """
         self._ensure_connection()
         
-        # Get all order IDs for the symbol
-        order_ids = self.redis.smembers(f"symbol:{symbol}:orders")
+        symbol_orders_key = f"symbol:{symbol}:orders"
+        batch = []
+        for order_id in self.redis.sscan_iter(symbol_orders_key, count=CLEAR_BATCH_SIZE):
+            batch.append(order_id)
+            if len(batch) >= CLEAR_BATCH_SIZE:
+                self._clear_orders_batch(batch)
+                batch = []
+        if batch:
+            self._clear_orders_batch(batch)
         
+        # Remove symbol data
         pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(symbol_orders_key)
+        for side in OrderSide:
+            pipe.delete(self._get_order_book_key(symbol, side),
+                        *self._get_level_totals_keys(symbol, side))
+        pipe.delete(f"trades:{symbol}")
+        pipe.execute()
+    
+    def _clear_orders_batch(self, order_ids: List[bytes]):
+        """Drop a batch of orders from their users' sets and their price levels."""
+        blobs = self.redis.mget([b"order:" + order_id for order_id in order_ids])
         
-        for order_id in order_ids:
-            # Get order details
-            order_data = self.redis.hgetall(f"order:{order_id}")
-            if order_data:
-                order = Order.from_dict(order_data)
-                
+        pipe = self.redis.pipeline(transaction=False)
+        price_keys = set()
+        for order_id, blob in zip(order_ids, blobs):
+            order = Order.from_json(blob)
+            if order is not None:
                 # Remove from user orders
-                pipe.srem(f"user:{order.user_id}:orders", order_id)
+                pipe.zrem(self._get_user_orders_key(order.user_id), order_id)
+                pipe.zrem(self._get_user_orders_key(order.user_id, order.status), order_id)
                 
-                # Remove from order book if it's a limit order
+                # Its price level goes entirely; the book ZSETs are dropped after
                 if order.order_type == OrderType.LIMIT and order.price:
-                    price_key = self._get_price_key(order.symbol, order.side, order.price)
-                    order_book_key = self._get_order_book_key(order.symbol, order.side)
-                    
-                    pipe.lrem(price_key, 0, order_id)
-                    pipe.delete(price_key, f"{price_key}:meta")
-                    pipe.zrem(order_book_key, str(order.price))
-        
-        # Remove symbol data
-        pipe.delete(f"symbol:{symbol}:orders")
-        pipe.delete(f"{symbol}:bids")
-        pipe.delete(f"{symbol}:asks")
-        pipe.delete(f"trades:{symbol}")
+                    ticks = self._price_to_ticks(order.price)
+                    price_keys.add(self._get_price_key(order.symbol, order.side, ticks))
         
+        if price_keys:
+            pipe.delete(*price_keys)
         pipe.execute()
     
     def ping(self) -> bool:
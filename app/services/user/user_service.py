@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from fastapi import HTTPException, status
 
@@ -7,12 +9,13 @@ from app.schemas.user import UserUpdate, UserResponse
 
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_profile(self, user_id: int) -> Optional[User]:
+    async def get_user_profile(self, user_id: int) -> Optional[User]:
         """Get user profile by ID."""
-        user = self.db.query(User).filter(User.id == user_id).first()
+        # Primary-key lookup; served from the identity map when already loaded
+        user = await self.db.get(User, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -20,22 +23,13 @@ class UserService:
             )
         return user
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
+    async def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return self.db.query(User).filter(User.username == username).first()
+        return await self.db.scalar(lambda_stmt(lambda: select(User).where(User.username == username)))
 
-    def update_user_profile(self, user_id: int, user_data: UserUpdate) -> User:
+    async def update_user_profile(self, user_id: int, user_data: UserUpdate) -> User:
         """Update user profile."""
-        user = self.get_user_profile(user_id)
-        
-        # Check if username is being changed and if it's already taken
-        if user_data.username and user_data.username != user.username:
-            existing_user = self.get_user_by_username(user_data.username)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already taken"
-                )
+        user = await self.get_user_profile(user_id)
         
         # Update fields
         if user_data.full_name is not None:
@@ -43,23 +37,31 @@ class UserService:
         if user_data.username is not None:
             user.username = user_data.username
         
-        self.db.commit()
-        self.db.refresh(user)
+        # A taken username is caught by the unique index rather than probed first
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already taken"
+            )
+        await self.db.refresh(user)
         
         return user
 
-    def deactivate_user(self, user_id: int) -> User:
+    async def deactivate_user(self, user_id: int) -> User:
         """Deactivate a user account."""
-        user = self.get_user_profile(user_id)
+        user = await self.get_user_profile(user_id)
         user.is_active = False
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def activate_user(self, user_id: int) -> User:
+    async def activate_user(self, user_id: int) -> User:
         """Activate a user account."""
-        user = self.get_user_profile(user_id)
+        user = await self.get_user_profile(user_id)
         user.is_active = True
-        self.db.commit()
-        self.db.refresh(user)
-        return user 
\ No newline at end of file
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
@@ -0,0 +1,21 @@
+"""Matching worker for REDIS_STREAM_MATCHING.
+
+Runs the matcher for one symbol; start one process per traded symbol:
+
+    python -m app.tasks.matcher BTC-USD
+"""
+import sys
+
+from app.services.trading_engine.redis_order_book import redis_order_book
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.tasks.matcher SYMBOL")
+
+    symbol = sys.argv[1]
+    redis_order_book.run_matcher(symbol, consumer=f"matcher:{symbol}")
+
+
+if __name__ == "__main__":
+    main()
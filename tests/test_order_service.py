@@ -0,0 +1,51 @@
+import orjson
+
+from app.services.order.order_service import OrderService
+from app.services.trading_engine.redis_order_book import Trade
+
+
+class _StreamOrderBook:
+    """Order book stand-in returning trades as read back from a Redis stream."""
+
+    def get_recent_trades(self, symbol, limit=50):
+        # Stream entries hold every field as a string
+        return [Trade.from_dict({
+            "id": "1",
+            "symbol": symbol,
+            "buy_order_id": "2",
+            "sell_order_id": "3",
+            "quantity": "0.4",
+            "price": "100.0",
+            "executed_at": "2026-01-02T03:04:05.123456",
+        })]
+
+
+def _service():
+    service = OrderService()
+    service.order_book = _StreamOrderBook()
+    return service
+
+
+def test_columnar_trades_serialize_with_numeric_types():
+    payload = orjson.loads(orjson.dumps(_service().get_recent_trades_columnar("BTC-USD")))
+
+    assert payload["ids"] == [1]
+    assert payload["buy_order_ids"] == [2]
+    assert payload["sell_order_ids"] == [3]
+    assert payload["quantities"] == [0.4]
+    assert payload["prices"] == [100.0]
+    for column in ("ids", "buy_order_ids", "sell_order_ids"):
+        assert all(type(value) is int for value in payload[column])
+    for column in ("quantities", "prices"):
+        assert all(type(value) is float for value in payload[column])
+    assert payload["executed_at"] == ["2026-01-02T03:04:05.123456"]
+
+
+def test_columnar_and_array_trades_agree():
+    service = _service()
+    columns = orjson.loads(orjson.dumps(service.get_recent_trades_columnar("BTC-USD")))
+    (trade,) = orjson.loads(orjson.dumps(service.get_recent_trades("BTC-USD")))
+
+    assert columns["ids"][0] == trade["id"]
+    assert columns["quantities"][0] == trade["quantity"]
+    assert columns["prices"][0] == trade["price"]
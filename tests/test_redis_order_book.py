@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from app.services.trading_engine.redis_order_book import Trade
+
+
+def _stream_fields(executed_at):
+    return {
+        "id": "1",
+        "symbol": "BTC-USD",
+        "buy_order_id": "2",
+        "sell_order_id": "3",
+        "quantity": "0.4",
+        "price": "100.0",
+        "executed_at": executed_at,
+    }
+
+
+def test_trade_from_dict_reads_iso_executed_at():
+    trade = Trade.from_dict(_stream_fields("2026-01-02T03:04:05.123456"))
+
+    assert trade.executed_at == datetime(2026, 1, 2, 3, 4, 5, 123456)
+
+
+def test_trade_from_dict_reads_legacy_epoch_executed_at():
+    trade = Trade.from_dict(_stream_fields("1767323045"))
+
+    assert trade.executed_at == datetime(2026, 1, 2, 3, 4, 5)